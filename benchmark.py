@@ -0,0 +1,127 @@
+"""
+Preview decoder benchmark - compares the decoder backends from main.py
+Every backend is measured decoding at full resolution and resizing afterwards,
+and decoding straight to the preview size. Each case runs in its own process
+so peak RSS is comparable.
+Usage:
+    python benchmark.py video.mp4 [--frames 300] [--seeks 20] [--size 720x405]
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+import time
+
+import cv2
+
+from main import DECODERS, create_decoder, find_ffmpeg, fit_size
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 2**20
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 1024
+
+
+def bench_decoder(name, path, frames, seeks, box, full_decode):
+    decoder = create_decoder(name, find_ffmpeg())
+
+    start = time.perf_counter()
+    if not decoder.open(path):
+        return None
+    open_time = time.perf_counter() - start
+
+    # Preview size as the app computes it from the canvas
+    preview_size = fit_size(decoder.width, decoder.height, *box)
+    if not full_decode and preview_size[0] < decoder.width:
+        decoder.set_output_size(preview_size)
+
+    # Sequential decode from the beginning, as during playback.
+    # Frames that are not decoded at preview size get resized like in display_frame.
+    start = time.perf_counter()
+    decoded = 0
+    while decoded < frames:
+        pts, frame = decoder.read()
+        if frame is None:
+            break
+        if (frame.shape[1], frame.shape[0]) != preview_size:
+            cv2.resize(frame, preview_size, interpolation=cv2.INTER_AREA)
+        decoded += 1
+    sequential_time = time.perf_counter() - start
+
+    # Random seeks, as when dragging the slider
+    rnd = random.Random(0)
+    duration = decoder.duration or decoded / decoder.fps
+    seek_times = []
+    for _ in range(seeks):
+        target = rnd.uniform(0, max(0, duration - 1))
+        start = time.perf_counter()
+        decoder.seek(target)
+        decoder.read()
+        seek_times.append(time.perf_counter() - start)
+
+    decoder.close()
+    width, height = decoder.output_size or (decoder.width, decoder.height)
+    return {
+        "open_ms": open_time * 1000,
+        "frames": decoded,
+        "frame_ms": sequential_time / decoded * 1000 if decoded else 0,
+        "seek_ms": sum(seek_times) / len(seek_times) * 1000 if seek_times else 0,
+        "rss_mb": peak_rss_mb(),
+        "decode_size": f"{width}x{height}",
+        "meta": f"{decoder.width}x{decoder.height} {decoder.fps:.3f} fps {decoder.frame_count} frames",
+    }
+
+
+def run_case(args, name, full_decode):
+    cmd = [sys.executable, __file__, args.path, "--worker", name, "--size", args.size,
+           "--frames", str(args.frames), "--seeks", str(args.seeks)]
+    if full_decode:
+        cmd.append("--full-decode")
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0 or not result.stdout.strip():
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare preview decoder backends")
+    parser.add_argument("path")
+    parser.add_argument("--frames", type=int, default=300, help="frames to decode sequentially")
+    parser.add_argument("--seeks", type=int, default=20, help="number of random seeks")
+    parser.add_argument("--decoders", default=",".join(DECODERS), help="comma separated backend list")
+    parser.add_argument("--size", default="720x405", help="preview canvas size, WxH")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--full-decode", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        box = tuple(int(v) for v in args.size.split("x"))
+        print(json.dumps(bench_decoder(args.worker, args.path, args.frames, args.seeks,
+                                       box, args.full_decode)))
+        return
+
+    print(f"{'decoder':<8} {'decode':>10} {'open ms':>9} {'frames':>7} {'frame ms':>9} "
+          f"{'seek ms':>9} {'RSS MB':>8}  metadata")
+    for name in args.decoders.split(","):
+        for full_decode in (True, False):
+            result = run_case(args, name, full_decode)
+            if result is None:
+                print(f"{name:<8} failed to open")
+                break
+            rss = f"{result['rss_mb']:8.1f}" if result["rss_mb"] is not None else f"{'n/a':>8}"
+            print(f"{name:<8} {result['decode_size']:>10} {result['open_ms']:9.1f} {result['frames']:7d} "
+                  f"{result['frame_ms']:9.2f} {result['seek_ms']:9.1f} {rss}  {result['meta']}")
+
+
+if __name__ == "__main__":
+    main()
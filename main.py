@@ -5,17 +5,1075 @@ Requirements:
     ffmpeg.exe must be in the same directory as this script
 """
 defOpts = "-c:v libx264 -preset ultrafast -crf 18"
+defDecoder = "auto"
+defCacheSizeMb = 1024
+defBlockSizeKb = 1024
+defReadahead = 8
+defSampleInterval = 0.5
+defMaxDistance = 10
+defRescanInterval = 300
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv", ".webm", ".ts", ".m2ts", ".mts")
+defRenditions = [
+    {"name": "master", "suffix": "_master", "scale": "",
+     "options": "-c:v libx264 -preset medium -crf 16 -c:a aac -b:a 192k"},
+    {"name": "1080p", "suffix": "_1080p", "scale": "-2:1080",
+     "options": "-c:v libx264 -preset fast -crf 20 -c:a aac -b:a 160k"},
+    {"name": "proxy", "suffix": "_720p_proxy", "scale": "-2:720",
+     "options": "-c:v libx264 -preset veryfast -crf 28 -c:a aac -b:a 96k"},
+]
 
+import bisect
+import concurrent.futures
 import configparser
+import math
 import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
+from tkinter import filedialog, messagebox, simpledialog, ttk
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import urllib.parse
+import urllib.request
 import cv2
+import numpy as np
 from PIL import Image, ImageTk
 import subprocess
 import os
+import queue
+import re
+import shutil
 import threading
 import time
 import tempfile
+import uuid
+
+
+def find_ffmpeg():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    ffmpeg_path = os.path.join(script_dir, "ffmpeg.exe")
+    if not os.path.exists(ffmpeg_path):
+        # Try just 'ffmpeg' in PATH
+        ffmpeg_path = "ffmpeg"
+    return ffmpeg_path
+
+
+class VideoDecoder:
+    """
+    Preview decoder interface.
+
+    After open() the metadata attributes are filled in. seek() positions the
+    decoder at a timestamp in seconds, read() returns (pts, frame) for the next
+    frame, where frame is an RGB uint8 array, or (None, None) at the end.
+    pts is the presentation timestamp of the frame in seconds from the start
+    of the file, as reported by the backend.
+    The returned frame may be reused by the next read(), copy it to keep it.
+    set_output_size() makes read() return frames scaled to (width, height),
+    None means full resolution.
+    """
+    name = "base"
+
+    def __init__(self):
+        self.path = None
+        self.width = 0
+        self.height = 0
+        self.fps = 30
+        self.frame_count = 0
+        self.duration = 0
+        self.output_size = None
+
+    def open(self, path):
+        raise NotImplementedError
+
+    def set_output_size(self, size):
+        self.output_size = size
+
+    def seek(self, timestamp):
+        raise NotImplementedError
+
+    def read(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class OpenCVDecoder(VideoDecoder):
+    name = "opencv"
+
+    def __init__(self):
+        super().__init__()
+        self.cap = None
+        self.next_index = 0
+
+    def open(self, path):
+        self.close()
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            self.cap = None
+            return False
+
+        self.path = path
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS)
+        if self.fps <= 0:
+            self.fps = 30
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.duration = self.frame_count / self.fps
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.next_index = 0
+        return True
+
+    def seek(self, timestamp):
+        self.next_index = max(0, int(round(timestamp * self.fps)))
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.next_index)
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if not ret:
+            return None, None
+        # Timestamp of the frame just decoded; nominal if the backend has none
+        msec = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+        pts = msec / 1000 if msec > 0 or self.next_index == 0 else self.next_index / self.fps
+        self.next_index += 1
+        # OpenCV always decodes at full size, at least convert the small frame
+        if self.output_size is not None and self.output_size != (frame.shape[1], frame.shape[0]):
+            frame = cv2.resize(frame, self.output_size, interpolation=cv2.INTER_AREA)
+        return pts, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def close(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class FFmpegDecoder(VideoDecoder):
+    """
+    Streams rgb24 frames from an ffmpeg process through a pipe straight into
+    a preallocated buffer. Seeking restarts ffmpeg with an accurate -ss.
+    Frame timestamps come from the showinfo filter on ffmpeg's stderr.
+    With an output size set, ffmpeg scales the frames before they reach the
+    pipe, so only preview-sized frames are copied into Python.
+    """
+    name = "ffmpeg"
+
+    def __init__(self, ffmpeg_path=None):
+        super().__init__()
+        self.ffmpeg_path = ffmpeg_path or find_ffmpeg()
+        self.proc = None
+        self.buffer = None
+        self.start_time = 0
+        self.stream_start = 0
+        self.frames_read = 0
+        self.last_pts = None
+        self.pts_queue = None
+        self.at_end = False
+
+    def probe(self, path):
+        result = subprocess.run([self.ffmpeg_path, "-hide_banner", "-i", path],
+                                capture_output=True, text=True, errors="ignore",
+                                creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
+        info = result.stderr
+
+        video_line = None
+        for line in info.splitlines():
+            if re.search(r"Stream #\d+:\d+.*: Video:", line):
+                video_line = line
+                break
+        if video_line is None:
+            return False
+
+        size = re.search(r"\b(\d{2,5})x(\d{2,5})\b", video_line)
+        if size is None:
+            return False
+        self.width = int(size.group(1))
+        self.height = int(size.group(2))
+
+        fps = re.search(r"([\d.]+)(k?) fps", video_line) or re.search(r"([\d.]+)(k?) tbr", video_line)
+        self.fps = float(fps.group(1)) * (1000 if fps.group(2) else 1) if fps else 30
+        if self.fps <= 0:
+            self.fps = 30
+
+        duration = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", info)
+        if duration:
+            h, m, s = duration.groups()
+            self.duration = int(h) * 3600 + int(m) * 60 + float(s)
+        else:
+            self.duration = 0
+        start = re.search(r"Duration: .*?, start: (-?[\d.]+)", info)
+        self.stream_start = float(start.group(1)) if start else 0
+        self.frame_count = int(round(self.duration * self.fps))
+        return True
+
+    def open(self, path):
+        self.close()
+        try:
+            if not self.probe(path):
+                return False
+        except OSError:
+            return False
+
+        self.path = path
+        self.allocate_buffer()
+        self.seek(0)
+        return True
+
+    def allocate_buffer(self):
+        width, height = self.output_size or (self.width, self.height)
+        self.buffer = np.empty((height, width, 3), dtype=np.uint8)
+
+    def set_output_size(self, size):
+        if size == self.output_size:
+            return
+        super().set_output_size(size)
+        if self.path is not None:
+            self.allocate_buffer()
+            if self.last_pts is not None:
+                self.seek(self.last_pts + 1 / self.fps)
+            else:
+                self.seek(self.start_time)
+
+    def seek(self, timestamp):
+        # ffmpeg is started lazily by the next read()
+        self.stop_process()
+        self.start_time = max(0, timestamp)
+        self.frames_read = 0
+        self.last_pts = None
+        self.at_end = False
+
+    def start_process(self):
+        # -copyts keeps the source timestamps, showinfo logs them for every frame
+        filters = []
+        if self.output_size is not None:
+            filters.append("scale=%d:%d:flags=area" % self.output_size)
+        filters.append("showinfo")
+        cmd = [
+            self.ffmpeg_path,
+            "-hide_banner", "-nostats",
+            "-v", "info",
+            "-nostdin",
+            "-ss", f"{self.start_time:.6f}",
+            "-copyts",
+            "-i", self.path,
+            "-map", "0:v:0",
+            "-an", "-sn",
+            "-vf", ",".join(filters),
+            "-vsync", "passthrough",
+            "-f", "rawvideo",
+            "-pix_fmt", "rgb24",
+            "-"
+        ]
+        self.proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                     bufsize=self.buffer.nbytes,
+                                     creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
+        self.pts_queue = queue.Queue()
+        thread = threading.Thread(target=self.read_timestamps, args=(self.proc.stderr, self.pts_queue))
+        thread.daemon = True
+        thread.start()
+
+    @staticmethod
+    def read_timestamps(stream, pts_queue):
+        # One showinfo line per frame, in output order
+        try:
+            for line in stream:
+                match = re.search(rb"\] n:\s*\d+ pts:\s*\S+ pts_time:(\S+)", line)
+                if match:
+                    try:
+                        pts_queue.put(float(match.group(1)))
+                    except ValueError:
+                        pts_queue.put(None)
+        except (OSError, ValueError):
+            pass
+        finally:
+            stream.close()
+
+    def read(self):
+        if self.proc is None:
+            if self.path is None or self.at_end:
+                return None, None
+            self.start_process()
+
+        view = memoryview(self.buffer).cast("B")
+        filled = 0
+        while filled < len(view):
+            n = self.proc.stdout.readinto(view[filled:])
+            if not n:
+                self.stop_process()
+                self.at_end = True
+                return None, None
+            filled += n
+
+        try:
+            pts = self.pts_queue.get(timeout=1)
+        except queue.Empty:
+            pts = None
+        if pts is not None:
+            pts -= self.stream_start
+        elif self.last_pts is not None:
+            pts = self.last_pts + 1 / self.fps
+        else:
+            pts = self.start_time
+        self.last_pts = pts
+        self.frames_read += 1
+        return pts, self.buffer
+
+    def stop_process(self):
+        if self.proc is not None:
+            self.proc.kill()
+            self.proc.stdout.close()
+            self.proc.wait()
+            self.proc = None
+
+    def close(self):
+        self.stop_process()
+
+
+DECODERS = {
+    OpenCVDecoder.name: OpenCVDecoder,
+    FFmpegDecoder.name: FFmpegDecoder,
+}
+
+
+def create_decoder(name, ffmpeg_path=None):
+    if name == "auto":
+        # ffmpeg decodes straight at preview size, OpenCV only scales after a full size decode
+        ffmpeg_path = ffmpeg_path or find_ffmpeg()
+        name = FFmpegDecoder.name if shutil.which(ffmpeg_path) else OpenCVDecoder.name
+    if name == FFmpegDecoder.name:
+        return FFmpegDecoder(ffmpeg_path)
+    return DECODERS.get(name, OpenCVDecoder)()
+
+
+class PacketIndex:
+    """
+    Timestamps of the video packets of a local file, from a demux-only ffmpeg
+    scan (-c copy -f framecrc). update() scans only from shortly before the
+    last indexed packet, so a file that is still being written is extended
+    incrementally instead of being rescanned from zero.
+    """
+    overlap = 2.0  # seconds rescanned before the last packet, -ss lands on a keyframe
+
+    def __init__(self, ffmpeg_path, path):
+        self.ffmpeg_path = ffmpeg_path
+        self.path = path
+        self.pts = []  # seconds from the start of the file, ascending
+        self.start_time = None
+        self.size = 0
+
+    @property
+    def frame_count(self):
+        return len(self.pts)
+
+    def update(self):
+        """Index packets written since the last call, returns True if any were added."""
+        size = os.path.getsize(self.path)
+        if size == self.size:
+            return False
+
+        cmd = [self.ffmpeg_path, "-v", "error", "-nostdin"]
+        if self.pts:
+            cmd += ["-ss", f"{max(0, self.pts[-1] - self.overlap):.6f}"]
+        cmd += [
+            "-copyts",
+            "-i", self.path,
+            "-map", "0:v:0",
+            "-c", "copy",
+            "-f", "framecrc",
+            "-"
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, errors="ignore",
+                                creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
+        self.size = size
+
+        # Lines: "#tb 0: 1/90000" and "0, dts, pts, duration, size, crc"
+        time_base = None
+        scanned = []
+        for line in result.stdout.splitlines():
+            if line.startswith("#tb 0:"):
+                num, den = line.split(":", 1)[1].strip().split("/")
+                time_base = int(num) / int(den)
+            elif line.startswith("0,") and time_base is not None:
+                fields = line.split(",")
+                if len(fields) >= 3:
+                    scanned.append(int(fields[2]) * time_base)
+        if not scanned:
+            return False
+        scanned.sort()
+
+        if self.start_time is None:
+            self.start_time = scanned[0]
+        scanned = [t - self.start_time for t in scanned]
+
+        # Merge by value over the rescanned window: B-frames of the GOP that was
+        # cut off by the last scan have lower pts than packets already indexed
+        tail_start = bisect.bisect_left(self.pts, scanned[0] - 1e-6)
+        tail = self.pts[tail_start:]
+        known = {round(t, 6) for t in tail}
+        added = [t for t in scanned if round(t, 6) not in known]
+        if added:
+            self.pts[tail_start:] = sorted(tail + added)
+        return bool(added)
+
+
+PHASH_SIZE = 32
+SEARCH_PHASES = 16  # at most this many query samplings per interval, normally one per frame
+REFINE_SECONDS = 1.0  # length of the query start that is compared frame by frame
+POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def dct_matrix(n):
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    matrix = np.sqrt(2 / n) * np.cos(np.pi * (2 * x + 1) * k / (2 * n))
+    matrix[0] /= np.sqrt(2)
+    return matrix.astype(np.float32)
+
+
+PHASH_DCT = dct_matrix(PHASH_SIZE)
+
+
+def phash_frames(frames):
+    """64-bit DCT perceptual hashes of (N, 32, 32) grayscale frames, as uint64."""
+    coeffs = PHASH_DCT @ frames.astype(np.float32) @ PHASH_DCT.T
+    low = coeffs[:, :8, :8].reshape(len(frames), 64)
+    # Compare against the median of the low frequencies, without the DC term
+    bits = low > np.median(low[:, 1:], axis=1)[:, None]
+    return np.packbits(bits, axis=1).view(">u8").reshape(-1).astype(np.uint64)
+
+
+def hamming(a, b):
+    """Bit distance between uint64 hash arrays, broadcasting like a ^ b."""
+    x = np.ascontiguousarray(np.bitwise_xor(a, b), dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(x)
+    return POPCOUNT8[x.view(np.uint8)].reshape(x.shape + (8,)).sum(axis=-1)
+
+
+def hash_video_file(ffmpeg_path, path, interval, start=None, duration=None):
+    """
+    Hashes of frames sampled every `interval` seconds, decoded by ffmpeg at
+    32x32 gray. Returns (path, hashes). Module level so a process pool can run it.
+    """
+    cmd = [ffmpeg_path, "-v", "error", "-nostdin"]
+    if start is not None:
+        cmd += ["-ss", f"{start:.6f}"]
+    if duration is not None:
+        cmd += ["-t", f"{duration:.6f}"]
+    # start_time=0 keeps the sample grid at multiples of interval from the
+    # seek point, otherwise fps anchors it at the first frame after the seek
+    cmd += [
+        "-i", path,
+        "-map", "0:v:0",
+        "-an", "-sn",
+        "-vf", f"fps={1 / interval:g}:start_time=0,scale={PHASH_SIZE}:{PHASH_SIZE}:flags=area,format=gray",
+        "-f", "rawvideo",
+        "-"
+    ]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
+
+    # Hash in chunks so long files never sit in memory as raw frames
+    frame_bytes = PHASH_SIZE * PHASH_SIZE
+    chunks = []
+    while True:
+        data = proc.stdout.read(frame_bytes * 256)
+        usable = len(data) - len(data) % frame_bytes
+        if usable:
+            frames = np.frombuffer(data[:usable], dtype=np.uint8).reshape(-1, PHASH_SIZE, PHASH_SIZE)
+            chunks.append(phash_frames(frames))
+        if len(data) < frame_bytes * 256:
+            break
+    proc.stdout.close()
+    proc.wait()
+    return path, np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.uint64)
+
+
+def find_sequence(hashes, query, max_distance):
+    """
+    Occurrences of `query` in `hashes` with a mean bit distance of at most
+    max_distance, as (start index, distance) in index order. Of overlapping
+    windows only the closest one is kept.
+    """
+    length = len(query)
+    if length == 0 or len(hashes) < length:
+        return []
+
+    # Cheap prefilter on the first hash, then the full window for candidates
+    candidates = np.nonzero(hamming(hashes[:len(hashes) - length + 1], query[0]) <= max_distance * 2)[0]
+    if len(candidates) == 0:
+        return []
+    windows = hashes[candidates[:, None] + np.arange(length)]
+    distances = hamming(windows, query).mean(axis=1)
+    good = distances <= max_distance
+    candidates = candidates[good]
+    distances = distances[good]
+
+    matches = []
+    for i in np.argsort(distances, kind="stable"):
+        idx = int(candidates[i])
+        if all(abs(idx - other) >= length for other, _ in matches):
+            matches.append((idx, float(distances[i])))
+    return sorted(matches)
+
+
+def hash_query(ffmpeg_path, path, start, end, interval, phases):
+    """
+    Hashes of the clip [start, end) sampled every `interval` at `phases` shifts
+    within one interval, as [(shift, hashes)]. The first shift puts the samples
+    on the index grid of the file itself (multiples of interval), the others
+    cover occurrences that sit at another phase of the grid.
+    """
+    first = math.ceil(start / interval - 1e-9) * interval - start
+    queries = []
+    for p in range(phases):
+        shift = (first + p * interval / phases) % interval
+        if shift >= end - start:
+            continue
+        hashes = hash_video_file(ffmpeg_path, path, interval, start + shift, end - start - shift)[1]
+        if len(hashes):
+            queries.append((shift, hashes))
+    return queries
+
+
+def locate_sequence(hashes, queries, interval, max_distance, length):
+    """
+    Start times of the clip hashed by hash_query in `hashes` (sampled every
+    `interval` from 0), the closest phase for every occurrence.
+    """
+    found = []
+    for shift, query in queries:
+        for idx, distance in find_sequence(hashes, query, max_distance):
+            found.append((distance, max(0.0, idx * interval - shift)))
+    starts = []
+    for distance, start in sorted(found):
+        if all(abs(start - other) >= max(length, interval) for other in starts):
+            starts.append(start)
+    return sorted(starts)
+
+
+def refine_start(ffmpeg_path, path, estimate, head, fps, slack):
+    """
+    Frame accurate start of a match near `estimate`: `head`, the first frames
+    of the query hashed at fps, is compared at every frame up to `slack`
+    seconds before and after the estimate.
+    """
+    first = max(0, int(round((estimate - slack) * fps)))
+    count = int(round(2 * slack * fps)) + len(head)
+    hashes = hash_video_file(ffmpeg_path, path, 1 / fps, first / fps, count / fps)[1]
+    positions = len(hashes) - len(head) + 1
+    if len(head) == 0 or positions <= 0:
+        return estimate
+    windows = hashes[np.arange(positions)[:, None] + np.arange(len(head))]
+    distances = hamming(windows, head).mean(axis=1)
+    return (first + int(np.argmin(distances))) / fps
+
+
+class PHashIndex:
+    """
+    Perceptual hashes of frames sampled from every video in a library folder,
+    stored in <folder>/.vcut_phash.npz. update() hashes new and changed files
+    in a process pool and drops removed ones; unchanged files are kept.
+    """
+    filename = ".vcut_phash.npz"
+
+    def __init__(self, folder, interval):
+        self.folder = folder
+        self.interval = interval
+        self.files = {}  # path relative to folder -> (size, mtime, hashes)
+        self.lock = threading.Lock()
+
+    @property
+    def index_path(self):
+        return os.path.join(self.folder, self.filename)
+
+    def load(self):
+        if not os.path.exists(self.index_path):
+            return
+        with np.load(self.index_path, allow_pickle=False) as data:
+            if float(data["interval"]) != self.interval:
+                return  # sampled differently, everything gets rehashed
+            bounds = np.append(data["offsets"], len(data["hashes"]))
+            hashes = data["hashes"]
+            for i, path in enumerate(data["paths"]):
+                self.files[str(path)] = (int(data["sizes"][i]), float(data["mtimes"][i]),
+                                         hashes[bounds[i]:bounds[i + 1]])
+
+    def save(self):
+        with self.lock:
+            items = sorted(self.files.items())
+        offsets = np.cumsum([0] + [len(h) for _, (_, _, h) in items[:-1]]) if items else np.zeros(0)
+        temp_path = self.index_path + ".tmp.npz"
+        np.savez(temp_path,
+                 interval=np.float64(self.interval),
+                 paths=np.array([path for path, _ in items], dtype=str),
+                 sizes=np.array([size for _, (size, _, _) in items], dtype=np.int64),
+                 mtimes=np.array([mtime for _, (_, mtime, _) in items], dtype=np.float64),
+                 offsets=np.asarray(offsets, dtype=np.int64),
+                 hashes=np.concatenate([h for _, (_, _, h) in items]) if items else np.zeros(0, dtype=np.uint64))
+        os.replace(temp_path, self.index_path)
+
+    def scan_files(self):
+        found = {}
+        for root, dirs, names in os.walk(self.folder):
+            for name in names:
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    full_path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(full_path)
+                    except OSError:
+                        continue
+                    found[os.path.relpath(full_path, self.folder)] = (stat.st_size, stat.st_mtime)
+        return found
+
+    def update(self, ffmpeg_path, workers=None, progress=None):
+        """Bring the index up to date with the folder, returns the number of hashed files."""
+        found = self.scan_files()
+        with self.lock:
+            for path in list(self.files):
+                if path not in found:
+                    del self.files[path]
+            todo = [path for path, (size, mtime) in found.items()
+                    if self.files.get(path, (None, None))[:2] != (size, mtime)]
+        if not todo:
+            return 0
+
+        done = 0
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(hash_video_file, ffmpeg_path, os.path.join(self.folder, path),
+                                   self.interval): path for path in todo}
+            for future in concurrent.futures.as_completed(futures):
+                path = futures[future]
+                try:
+                    hashes = future.result()[1]
+                except Exception:
+                    continue
+                size, mtime = found[path]
+                with self.lock:
+                    self.files[path] = (size, mtime, hashes)
+                done += 1
+                if progress is not None:
+                    progress(done, len(todo))
+        self.save()
+        return done
+
+    def hashes_for(self, full_path):
+        """Stored hashes of a file if it is indexed and unchanged, else None."""
+        try:
+            path = os.path.relpath(os.path.abspath(full_path), os.path.abspath(self.folder))
+        except ValueError:
+            return None  # another drive
+        with self.lock:
+            entry = self.files.get(path)
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            return None
+        if (stat.st_size, stat.st_mtime) != entry[:2]:
+            return None
+        return entry[2]
+
+    def search(self, queries, max_distance, length):
+        """Yields (full path, start time) of every occurrence in the library, see locate_sequence."""
+        with self.lock:
+            items = list(self.files.items())
+        for path, (size, mtime, hashes) in items:
+            for start in locate_sequence(hashes, queries, self.interval, max_distance, length):
+                yield os.path.join(self.folder, path), start
+
+
+def fit_size(width, height, box_width, box_height):
+    """Largest size with the aspect ratio of width x height that fits the box."""
+    scale = min(box_width / width, box_height / height)
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def edit_duration(segments):
+    return sum(end - start for start, end in segments)
+
+
+def edit_to_source(segments, edit_time):
+    """Map a time on the edit timeline to (segment index, source time)."""
+    offset = 0
+    for i, (start, end) in enumerate(segments):
+        if edit_time < offset + (end - start):
+            return i, start + max(0, edit_time - offset)
+        offset += end - start
+    if segments:
+        return len(segments) - 1, segments[-1][1]
+    return None, None
+
+
+def source_to_edit(segments, source_time):
+    """Map a source time to the edit timeline, None if it is not in any segment."""
+    offset = 0
+    for start, end in segments:
+        if start <= source_time < end:
+            return offset + source_time - start
+        offset += end - start
+    return None
+
+
+class EditPreviewPlayer:
+    """
+    Plays (start, end) segments back to back as one virtual timeline.
+    Every segment gets its own decoder. While one segment plays, the decoder
+    for the next one is opened, seeked and its first frames decoded in the
+    background, so the transition doesn't wait for a seek.
+    """
+    prefetch_frames = 5
+
+    def __init__(self, make_decoder, segments, on_frame, on_finish):
+        self.make_decoder = make_decoder
+        self.segments = list(segments)
+        self.on_frame = on_frame
+        self.on_finish = on_finish
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self, edit_time=0):
+        self.thread = threading.Thread(target=self.run, args=(edit_time,))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def prefetch(self, idx, source_time):
+        slot = []
+
+        def work():
+            decoder = self.make_decoder()
+            if decoder is None:
+                return
+            end = self.segments[idx][1]
+            decoder.seek(source_time)
+            frames = []
+            while len(frames) < self.prefetch_frames and not self.stop_event.is_set():
+                pts, frame = decoder.read()
+                if frame is None or pts >= end:
+                    break
+                frames.append((pts, frame.copy()))
+            slot.append((decoder, frames))
+
+        thread = threading.Thread(target=work)
+        thread.daemon = True
+        thread.start()
+        return thread, slot
+
+    def read_segment(self, decoder, frames, end):
+        yield from frames
+        while not self.stop_event.is_set():
+            pts, frame = decoder.read()
+            if frame is None or pts >= end:
+                return
+            yield pts, frame.copy()
+
+    def run(self, edit_time):
+        idx, source_time = edit_to_source(self.segments, edit_time)
+        pending = self.prefetch(idx, source_time) if idx is not None else None
+        segment_offset = edit_duration(self.segments[:idx]) if idx is not None else 0
+        clock_start = time.perf_counter() - edit_time
+
+        while pending is not None and not self.stop_event.is_set():
+            thread, slot = pending
+            thread.join()
+            pending = None
+            if not slot:
+                break
+            decoder, frames = slot[0]
+
+            if idx + 1 < len(self.segments):
+                pending = self.prefetch(idx + 1, self.segments[idx + 1][0])
+
+            start, end = self.segments[idx]
+            for pts, frame in self.read_segment(decoder, frames, end):
+                position = segment_offset + max(0, pts - start)
+                delay = clock_start + position - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                if self.stop_event.is_set():
+                    break
+                self.on_frame(self, frame, idx, pts, position)
+            decoder.close()
+
+            segment_offset += end - start
+            idx += 1
+
+        # Release a prefetch that is no longer needed
+        if pending is not None:
+            thread, slot = pending
+            thread.join()
+            for decoder, frames in slot:
+                decoder.close()
+
+        self.on_finish(self)
+
+
+def is_remote(path):
+    return path.lower().startswith(("http://", "https://"))
+
+
+def path_key(path):
+    """Normalized form of a path for comparisons, URLs are kept as they are."""
+    if is_remote(path):
+        return path
+    return os.path.normcase(os.path.abspath(path))
+
+
+def source_name(path):
+    """File name of a local path or URL."""
+    if is_remote(path):
+        path = urllib.parse.unquote(urllib.parse.urlparse(path).path)
+    return os.path.basename(path.rstrip("/\\")) or "video"
+
+
+def source_ext(path):
+    """Container extension for copies of a source, .mkv if its name has none (e.g. ?id= URLs)."""
+    return os.path.splitext(source_name(path))[1] or ".mkv"
+
+
+class BlockCache:
+    """
+    Reads a remote file over HTTP range requests, block by block.
+    Fetched blocks are kept in an on-disk cache file of at most `capacity`
+    blocks; the remote file is stored sparsely, only the touched blocks.
+    When the file is full the least recently used block is evicted and its
+    slot reused. Sequential reads start a read-ahead of the next blocks.
+    """
+
+    def __init__(self, url, cache_dir, block_size, capacity, readahead):
+        self.url = url
+        self.block_size = block_size
+        self.capacity = max(1, capacity)
+        self.readahead = readahead
+        self.size = 0
+        self.slots = OrderedDict()  # block index -> (slot, length), in LRU order
+        self.free_slots = []
+        self.next_slot = 0
+        self.inflight = {}  # block index -> Event set when the fetch is done
+        self.last_block = -1
+        self.closed = False  # read-ahead threads may still finish fetches after close()
+        self.lock = threading.Lock()
+        fd, self.cache_path = tempfile.mkstemp(prefix="vcut_", suffix=".cache", dir=cache_dir)
+        self.file = os.fdopen(fd, "r+b")
+
+    def open(self):
+        # A one byte range request tells the size and whether ranges work
+        request = urllib.request.Request(self.url, headers={"Range": "bytes=0-0"})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            content_range = response.headers.get("Content-Range", "")
+            if response.status != 206 or "/" not in content_range:
+                raise Exception("Server does not support range requests")
+            self.size = int(content_range.rsplit("/", 1)[1])
+
+    def fetch(self, first, last):
+        start = first * self.block_size
+        end = min(self.size, (last + 1) * self.block_size) - 1
+        request = urllib.request.Request(self.url, headers={"Range": f"bytes={start}-{end}"})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            if response.status != 206:
+                raise Exception(f"Range request failed: HTTP {response.status}")
+            data = response.read()
+        if len(data) != end - start + 1:
+            raise Exception("Short read from server")
+        return data
+
+    def store(self, block, data):
+        # Called with the lock held
+        if self.closed or block in self.slots:
+            return
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        elif self.next_slot < self.capacity:
+            slot = self.next_slot
+            self.next_slot += 1
+        else:
+            evicted, (slot, length) = self.slots.popitem(last=False)
+        self.file.seek(slot * self.block_size)
+        self.file.write(data)
+        self.slots[block] = (slot, len(data))
+
+    def claim(self, blocks):
+        """Mark missing blocks as in flight, returns the ones this caller must fetch."""
+        claimed = []
+        with self.lock:
+            for block in blocks:
+                if block not in self.slots and block not in self.inflight:
+                    self.inflight[block] = threading.Event()
+                    claimed.append(block)
+        return claimed
+
+    def fetch_claimed(self, claimed):
+        # One range request per run of consecutive blocks
+        runs = []
+        for block in claimed:
+            if runs and runs[-1][1] == block - 1:
+                runs[-1][1] = block
+            else:
+                runs.append([block, block])
+        try:
+            for first, last in runs:
+                data = self.fetch(first, last)
+                with self.lock:
+                    for block in range(first, last + 1):
+                        offset = (block - first) * self.block_size
+                        self.store(block, data[offset:offset + self.block_size])
+        finally:
+            with self.lock:
+                for block in claimed:
+                    self.inflight.pop(block).set()
+
+    def read_ahead(self, claimed):
+        # Best effort, a block that failed here is fetched again when it is read
+        try:
+            self.fetch_claimed(claimed)
+        except Exception:
+            pass
+
+    def read_block(self, block):
+        while True:
+            with self.lock:
+                if self.closed:
+                    raise Exception("Cache is closed")
+                if block in self.slots:
+                    self.slots.move_to_end(block)
+                    slot, length = self.slots[block]
+                    self.file.seek(slot * self.block_size)
+                    return self.file.read(length)
+                event = self.inflight.get(block)
+            if event is not None:
+                event.wait()
+            else:
+                self.fetch_claimed(self.claim([block]))
+
+    def read(self, offset, size):
+        if offset >= self.size or size <= 0:
+            return b""
+        size = min(size, self.size - offset)
+        first = offset // self.block_size
+        last = (offset + size - 1) // self.block_size
+        last_block = (self.size - 1) // self.block_size
+
+        # Decoders and ffmpeg read sequentially, fetch ahead of them
+        sequential = first in (self.last_block, self.last_block + 1)
+        self.last_block = last
+        self.fetch_claimed(self.claim(range(first, last + 1)))
+        if sequential and self.readahead > 0:
+            ahead = self.claim(range(last + 1, min(last_block, last + self.readahead) + 1))
+            if ahead:
+                thread = threading.Thread(target=self.read_ahead, args=(ahead,))
+                thread.daemon = True
+                thread.start()
+
+        data = b"".join(self.read_block(block) for block in range(first, last + 1))
+        start = offset - first * self.block_size
+        return data[start:start + size]
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.file.close()
+        try:
+            os.remove(self.cache_path)
+        except OSError:
+            pass
+
+
+class RemoteSourceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def respond(self, send_body):
+        key = self.path.lstrip("/").split("/", 1)[0]
+        cache = self.server.caches.get(key)
+        if cache is None:
+            self.send_error(404)
+            return
+
+        start, end = 0, cache.size - 1
+        match = re.match(r"bytes=(\d*)-(\d*)$", self.headers.get("Range", "").strip())
+        if match and (match.group(1) or match.group(2)):
+            if match.group(1):
+                start = int(match.group(1))
+                if match.group(2):
+                    end = min(end, int(match.group(2)))
+            else:
+                start = max(0, cache.size - int(match.group(2)))
+            if start > end:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{cache.size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{cache.size}")
+        else:
+            self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        if not send_body:
+            return
+
+        # Stream block by block, the client hangs up when it seeks elsewhere
+        position = start
+        try:
+            while position <= end:
+                data = cache.read(position, min(cache.block_size, end - position + 1))
+                if not data:
+                    break
+                self.wfile.write(data)
+                position += len(data)
+        except (ConnectionError, OSError):
+            self.close_connection = True
+        except Exception:
+            # Upstream failed, the client gets a short response
+            self.close_connection = True
+
+
+class RemoteSourceServer:
+    """
+    Local HTTP server on 127.0.0.1 that serves remote files through their
+    BlockCache. Decoders and ffmpeg open the local URL and seek with range
+    requests, so only the byte ranges they touch are fetched upstream.
+    """
+
+    def __init__(self):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), RemoteSourceHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.caches = {}
+        self.thread = threading.Thread(target=self.httpd.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def add(self, cache):
+        key = uuid.uuid4().hex
+        self.httpd.caches[key] = cache
+        name = urllib.parse.quote(source_name(cache.url))
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/{key}/{name}"
+
+    def remove(self, local_url):
+        key = urllib.parse.urlparse(local_url).path.lstrip("/").split("/", 1)[0]
+        cache = self.httpd.caches.pop(key, None)
+        if cache is not None:
+            cache.close()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        for cache in list(self.httpd.caches.values()):
+            cache.close()
+        self.httpd.caches.clear()
+
+
 class VideoCutter:
     def __init__(self, root):
         self.root = root
@@ -25,7 +1083,11 @@ class VideoCutter:
         
         # Video variables
         self.video_path = None
-        self.cap = None
+        self.source_url = None  # what decoders and ffmpeg read, a local proxy URL for remote sources
+        self.remote_server = None
+        self.exporting = False  # the export thread reads source_url and its cache until cut_complete
+        self.decoder = None
+        self.next_decode_frame = 0
         self.total_frames = 0
         self.fps = 30
         self.current_frame = 0
@@ -39,6 +1101,24 @@ class VideoCutter:
         self.end_mark = None
         self.segments = []  # List of tuples: (start_time, end_time)
         
+        # Edit list preview
+        self.edit_player = None
+        self.edit_position = 0
+        self.edit_frame_pending = False
+        self.timeline_var = tk.StringVar(value="source")
+        
+        # Preview decode size, full resolution only for pixel peep
+        self.pixel_peep_var = tk.BooleanVar(value=False)
+        self.peep_center = (0.5, 0.5)
+        self.peep_frame = None  # last full resolution frame, panning crops it again
+        
+        # Follow mode for files that are still being written
+        self.follow_var = tk.BooleanVar(value=False)
+        self.following = False
+        self.packet_index = None
+        self.follow_job = None
+        self.follow_scanning = False
+        
         # Threading
         self.play_thread = None
         self.stop_thread = False
@@ -47,12 +1127,35 @@ class VideoCutter:
         # Encoding settings
         self.encoding_mode = "copy"          # default
         self.reencode_options = defOpts
+        self.renditions = [dict(r) for r in defRenditions]
+        self.decoder_backend = defDecoder
+        
+        # Remote source cache settings
+        self.cache_dir = ""
+        self.cache_size_mb = defCacheSizeMb
+        self.block_size_kb = defBlockSizeKb
+        self.readahead_blocks = defReadahead
+        
+        # Repeated content search over a video library
+        self.library_dir = ""
+        self.sample_interval = defSampleInterval
+        self.max_distance = defMaxDistance
+        self.rescan_interval = defRescanInterval
+        self.index_workers = 0
+        self.phash_index = None
+        self.library_indexing = False
+        self.repeats_searching = False
+        self.library_matches = {}  # normalized path -> [(start, end)] found for other files
+        self.rescan_job = None
         self.load_config()
         self.encoding_var = tk.StringVar(value=self.encoding_mode)     
         
         self.setup_ui()
         self.setup_styles()
         
+        if self.library_dir and os.path.isdir(self.library_dir):
+            self.root.after(1000, self.open_library)
+        
     def setup_styles(self):
         style = ttk.Style()
         style.theme_use('clam')
@@ -77,11 +1180,32 @@ class VideoCutter:
                             padx=15, pady=5, relief=tk.FLAT, cursor="hand2")
         open_btn.pack(side=tk.LEFT, padx=5)
         
+        open_url_btn = tk.Button(top_frame, text="Open URL", command=self.open_url,
+                                 bg="#4a90d9", fg="white", font=("Arial", 11, "bold"),
+                                 padx=15, pady=5, relief=tk.FLAT, cursor="hand2")
+        open_url_btn.pack(side=tk.LEFT, padx=5)
+        
         # File name label
         self.file_label = tk.Label(top_frame, text="No file opened", 
                                    bg="#2b2b2b", fg="#aaaaaa", font=("Arial", 10))
         self.file_label.pack(side=tk.LEFT, padx=10)
         
+        # Pixel peep: full resolution 1:1 view, click the video to pan
+        tk.Checkbutton(top_frame, text="Pixel peep 1:1",
+                       variable=self.pixel_peep_var,
+                       command=self.toggle_pixel_peep,
+                       bg="#2b2b2b", fg="#aaaaaa", selectcolor="#4a4a4a",
+                       activebackground="#2b2b2b", activeforeground="white",
+                       font=("Arial", 9)).pack(side=tk.RIGHT, padx=5)
+        
+        # Follow: keep extending the timeline while the file grows
+        tk.Checkbutton(top_frame, text="Follow growing file",
+                       variable=self.follow_var,
+                       command=self.toggle_follow,
+                       bg="#2b2b2b", fg="#aaaaaa", selectcolor="#4a4a4a",
+                       activebackground="#2b2b2b", activeforeground="white",
+                       font=("Arial", 9)).pack(side=tk.RIGHT, padx=5)
+        
         # Video canvas
         canvas_frame = tk.Frame(left_frame, bg="#1a1a1a", bd=2, relief=tk.SUNKEN)
         canvas_frame.pack(pady=10, padx=5)
@@ -89,6 +1213,8 @@ class VideoCutter:
         self.canvas = tk.Canvas(canvas_frame, width=720, height=405, bg="#1a1a1a",
                                highlightthickness=0)
         self.canvas.pack()
+        self.canvas.bind("<Configure>", self.on_canvas_resize)
+        self.canvas.bind("<Button-1>", self.on_canvas_click)
         
         # Slider frame
         slider_frame = tk.Frame(left_frame, bg="#2b2b2b")
@@ -109,6 +1235,17 @@ class VideoCutter:
                                    bg="#2b2b2b", fg="#ffffff", font=("Consolas", 11))
         self.time_label.pack()
         
+        # Timeline mode: source time or edit list time
+        timeline_frame = tk.Frame(left_frame, bg="#2b2b2b")
+        timeline_frame.pack()
+        for text, value in (("source time", "source"), ("edit list time", "edit")):
+            tk.Radiobutton(timeline_frame, text=text,
+                           variable=self.timeline_var, value=value,
+                           command=self.update_timeline_mode,
+                           bg="#2b2b2b", fg="#aaaaaa", selectcolor="#4a4a4a",
+                           activebackground="#2b2b2b", activeforeground="white",
+                           font=("Arial", 9)).pack(side=tk.LEFT, padx=5)
+        
         # Playback controls
         control_frame = tk.Frame(left_frame, bg="#2b2b2b")
         control_frame.pack(pady=15)
@@ -162,6 +1299,19 @@ class VideoCutter:
                                  padx=15, pady=8, relief=tk.FLAT, cursor="hand2")
         self.add_btn.pack(side=tk.LEFT, padx=15)
         
+        self.repeats_btn = tk.Button(mark_frame, text="Find Repeats",
+                                     command=self.show_repeats_menu,
+                                     bg="#00897b", fg="white", font=("Arial", 10, "bold"),
+                                     padx=15, pady=8, relief=tk.FLAT, cursor="hand2")
+        self.repeats_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.repeats_menu = tk.Menu(self.root, tearoff=0, bg="#2b2b2b", fg="white")
+        self.repeats_menu.add_command(label="Find in Current File", command=lambda: self.find_repeats("file"))
+        self.repeats_menu.add_command(label="Find in Library", command=lambda: self.find_repeats("library"))
+        self.repeats_menu.add_separator()
+        self.repeats_menu.add_command(label="Choose Library Folder...", command=self.choose_library)
+        self.repeats_menu.add_command(label="Update Library Index", command=self.update_library)
+        
         # Mark labels
         mark_info_frame = tk.Frame(left_frame, bg="#3a3a3a", padx=20, pady=10)
         mark_info_frame.pack(pady=5)
@@ -221,6 +1371,12 @@ class VideoCutter:
                                    cursor="hand2")
         self.clear_btn.pack(fill=tk.X, pady=3)
         
+        self.preview_btn = tk.Button(btn_frame, text="Preview Edit",
+                                     command=self.toggle_edit_preview,
+                                     bg="#4CAF50", fg="white", relief=tk.FLAT,
+                                     cursor="hand2")
+        self.preview_btn.pack(fill=tk.X, pady=3)
+        
         self.cut_btn = tk.Button(btn_frame, text="CUT VIDEO",
                                  command=self.cut_video,
                                  bg="#e91e63", fg="white", 
@@ -251,6 +1407,15 @@ class VideoCutter:
                        activebackground="#353535", activeforeground="white",
                        font=("Arial", 10)).pack(anchor=tk.W, pady=3)
 
+        tk.Radiobutton(encoding_frame, 
+                       text="renditions mode (config.ini)", 
+                       variable=self.encoding_var,
+                       value="renditions",
+                       command=self.update_encoding_mode,
+                       bg="#353535", fg="white", selectcolor="#4a4a4a", 
+                       activebackground="#353535", activeforeground="white",
+                       font=("Arial", 10)).pack(anchor=tk.W, pady=3)
+
         # Current options label
         tk.Label(encoding_frame, text="encode options:", 
                  bg="#353535", fg="#88ff88", font=("Consolas", 9)).pack(anchor=tk.W, pady=(8,2))
@@ -283,8 +1448,20 @@ class VideoCutter:
         self.slider_canvas.create_rectangle(10, 12, width-10, 18, 
                                            fill="#404040", outline="")
         
+        # Edit list timeline: segments laid out back to back
+        if self.timeline_var.get() == "edit":
+            total = edit_duration(self.segments)
+            offset = 0
+            for i, (start, end) in enumerate(self.segments):
+                x1 = 10 + (offset / total) * (width - 20)
+                x2 = 10 + ((offset + end - start) / total) * (width - 20)
+                self.slider_canvas.create_rectangle(x1, 10, x2, 20,
+                                                   fill="#9c27b0" if i % 2 == 0 else "#6a1b7a",
+                                                   outline="")
+                offset += end - start
+        
         # Draw marked regions
-        if self.total_frames > 0:
+        elif self.total_frames > 0:
             for start, end in self.segments:
                 x1 = 10 + (start / self.duration) * (width - 20)
                 x2 = 10 + (end / self.duration) * (width - 20)
@@ -292,12 +1469,14 @@ class VideoCutter:
                                                    fill="#9c27b0", outline="")
         
         # Draw current marks
-        if self.start_mark is not None and self.duration > 0:
-            x = 10 + (self.start_mark / self.duration) * (width - 20)
+        start_pos = self.mark_position(self.start_mark)
+        if start_pos is not None:
+            x = 10 + start_pos * (width - 20)
             self.slider_canvas.create_line(x, 5, x, 25, fill="#ff9800", width=2)
             
-        if self.end_mark is not None and self.duration > 0:
-            x = 10 + (self.end_mark / self.duration) * (width - 20)
+        end_pos = self.mark_position(self.end_mark)
+        if end_pos is not None:
+            x = 10 + end_pos * (width - 20)
             self.slider_canvas.create_line(x, 5, x, 25, fill="#ff5722", width=2)
         
         # Draw progress
@@ -306,17 +1485,34 @@ class VideoCutter:
         
         # Draw handle
         self.slider_canvas.create_oval(pos-8, 7, pos+8, 23, fill="#ffffff", outline="#cccccc")
+    
+    def mark_position(self, mark):
+        """Slider position 0..1 of a source time mark, None if it is not on the current timeline."""
+        if mark is None:
+            return None
+        if self.timeline_var.get() == "edit":
+            # Marks outside every segment have no place on the edit list timeline
+            total = edit_duration(self.segments)
+            position = source_to_edit(self.segments, mark)
+            if position is None or total <= 0:
+                return None
+            return position / total
+        if self.duration <= 0:
+            return None
+        return mark / self.duration
+    
     def on_slider_click(self, event):
-        if self.cap is None:
+        if self.decoder is None:
             return
         self.slider_dragging = True
+        self.stop_edit_preview()
         was_playing = self.is_playing
         if was_playing:
             self.pause_video()
         self.update_slider_from_mouse(event.x)
         
     def on_slider_drag(self, event):
-        if self.slider_dragging and self.cap is not None:
+        if self.slider_dragging and self.decoder is not None:
             self.update_slider_from_mouse(event.x)
             
     def on_slider_release(self, event):
@@ -329,7 +1525,12 @@ class VideoCutter:
         self.slider_value = value
         
         # Seek to frame
-        frame_num = int(value * self.total_frames)
+        if self.timeline_var.get() == "edit" and self.segments:
+            self.edit_position = value * edit_duration(self.segments)
+            idx, source_time = edit_to_source(self.segments, self.edit_position)
+            frame_num = int(source_time * self.fps)
+        else:
+            frame_num = int(value * self.total_frames)
         self.seek_to_frame(frame_num)
         self.draw_slider()
     def open_video(self):
@@ -342,37 +1543,84 @@ class VideoCutter:
         if path:
             self.load_video(path)
     
+    def open_url(self):
+        url = simpledialog.askstring("Open URL", "Video URL (http/https):", parent=self.root)
+        
+        if url and url.strip():
+            self.load_video(url.strip())
+    
+    def open_remote(self, url):
+        if self.remote_server is None:
+            self.remote_server = RemoteSourceServer()
+        block_size = self.block_size_kb * 1024
+        cache = BlockCache(url, self.cache_dir or None, block_size,
+                           self.cache_size_mb * 1024 // self.block_size_kb,
+                           self.readahead_blocks)
+        try:
+            cache.open()
+        except Exception:
+            cache.close()
+            raise
+        return self.remote_server.add(cache)
+    
+    def close_remote(self, source_url):
+        if self.remote_server is not None and source_url and is_remote(source_url):
+            self.remote_server.remove(source_url)
+    
     def load_video(self, path):
-        if self.cap is not None:
+        if self.exporting:
+            messagebox.showwarning("Warning", "Wait for the export to finish before opening another video!")
+            return
+        
+        self.stop_edit_preview()
+        self.stop_follow()
+        if self.decoder is not None:
             self.stop_thread = True
             time.sleep(0.1)
-            self.cap.release()
+            self.decoder.close()
+            self.decoder = None
+        self.close_remote(self.source_url)
+        self.source_url = None
+        
+        # Remote files are read through the local block cache
+        source_url = path
+        if is_remote(path):
+            try:
+                source_url = self.open_remote(path)
+            except Exception as exc:
+                messagebox.showerror("Error", f"Could not open URL:\n{exc}")
+                return
             
-        self.cap = cv2.VideoCapture(path)
+        decoder = create_decoder(self.decoder_backend, find_ffmpeg())
         
-        if not self.cap.isOpened():
+        if not decoder.open(source_url):
+            self.close_remote(source_url)
             messagebox.showerror("Error", "Could not open video file!")
             return
             
+        self.decoder = decoder
         self.video_path = path
-        self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        self.fps = self.cap.get(cv2.CAP_PROP_FPS)
-        if self.fps <= 0:
-            self.fps = 30
+        self.source_url = source_url
+        self.total_frames = decoder.frame_count
+        self.fps = decoder.fps
         self.duration = self.total_frames / self.fps
-        self.video_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        self.video_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.video_width = decoder.width
+        self.video_height = decoder.height
+        self.peep_center = (0.5, 0.5)
+        self.peep_frame = None
         
+        self.next_decode_frame = 0
         self.current_frame = 0
         self.is_playing = False
         self.stop_thread = False
         self.start_mark = None
         self.end_mark = None
         self.segments = []
+        self.edit_position = 0
         self.segment_listbox.delete(0, tk.END)
         
         # Update UI
-        filename = os.path.basename(path)
+        filename = source_name(path)
         self.file_label.config(text=filename)
         self.root.title(f"Video Cutter - {filename}")
         
@@ -381,55 +1629,279 @@ class VideoCutter:
         self.draw_slider()
         
         # Show first frame
+        self.apply_decode_size()
         self.show_frame(0)
         self.update_time_label()
         
-        self.status_label.config(text=f"{self.video_width}x{self.video_height} | {self.fps:.2f} fps")
+        self.status_label.config(text=f"{self.video_width}x{self.video_height} | {self.fps:.2f} fps | {self.decoder.name}")
+        
+        # Segments found for this file by an earlier library search
+        matches = self.library_matches.pop(path_key(path), None)
+        if matches:
+            self.add_segments(matches)
+            self.status_label.config(text=f"Added {len(matches)} segments from library search")
     
     def show_frame(self, frame_num):
-        if self.cap is None:
+        if self.decoder is None:
             return
             
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
-        ret, frame = self.cap.read()
+        # Sequential reads (playback, +1 frame) don't need a seek
+        if frame_num != self.next_decode_frame:
+            self.decoder.seek(frame_num / self.fps)
+        pts, frame = self.decoder.read()
+        self.next_decode_frame = frame_num + 1 if frame is not None else -1
         
-        if ret:
+        if frame is not None:
             self.current_frame = frame_num
-            
-            # Convert BGR to RGB
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Resize to fit canvas while maintaining aspect ratio
-            canvas_width = 720
-            canvas_height = 405
-            
-            h, w = frame.shape[:2]
-            scale = min(canvas_width / w, canvas_height / h)
-            new_w = int(w * scale)
-            new_h = int(h * scale)
-            
-            frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_AREA)
-            
-            # Convert to PhotoImage
-            image = Image.fromarray(frame)
-            photo = ImageTk.PhotoImage(image)
-            
-            # Center on canvas
-            x = (canvas_width - new_w) // 2
-            y = (canvas_height - new_h) // 2
-            
-            self.canvas.delete("all")
-            self.canvas.create_image(x, y, anchor=tk.NW, image=photo)
-            self.canvas.image = photo  # Keep reference
+            self.display_frame(frame)
             
             # Update slider
-            if self.total_frames > 0:
-                self.slider_value = frame_num / self.total_frames
-                if not self.slider_dragging:
-                    self.draw_slider()
-            
+            position = source_to_edit(self.segments, self.get_current_time())
+            if position is not None:
+                self.edit_position = position
+            self.update_slider_position()
             self.update_time_label()
     
+    def display_frame(self, frame):
+        canvas_width, canvas_height = self.get_canvas_size()
+        h, w = frame.shape[:2]
+        
+        if self.pixel_peep_var.get():
+            # Only valid until the decoder reads again, which always displays a new frame
+            self.peep_frame = frame
+            # Crop a canvas sized window around the peep center
+            x0 = int(self.peep_center[0] * w - canvas_width / 2)
+            y0 = int(self.peep_center[1] * h - canvas_height / 2)
+            x0 = max(0, min(x0, w - canvas_width))
+            y0 = max(0, min(y0, h - canvas_height))
+            frame = frame[y0:y0 + canvas_height, x0:x0 + canvas_width]
+        else:
+            self.peep_frame = None
+            # Frames normally arrive decoded at preview size already
+            new_w, new_h = fit_size(w, h, canvas_width, canvas_height)
+            if (new_w, new_h) != (w, h):
+                frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_AREA)
+        new_h, new_w = frame.shape[:2]
+        
+        # Convert to PhotoImage
+        image = Image.fromarray(frame)
+        photo = ImageTk.PhotoImage(image)
+        
+        # Center on canvas
+        x = (canvas_width - new_w) // 2
+        y = (canvas_height - new_h) // 2
+        
+        self.canvas.delete("all")
+        self.canvas.create_image(x, y, anchor=tk.NW, image=photo)
+        self.canvas.image = photo  # Keep reference
+    
+    def get_canvas_size(self):
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        if width < 10 or height < 10:
+            width = int(self.canvas.cget("width"))
+            height = int(self.canvas.cget("height"))
+        return width, height
+    
+    def get_decode_size(self):
+        if self.pixel_peep_var.get() or self.video_width <= 0 or self.video_height <= 0:
+            return None
+        size = fit_size(self.video_width, self.video_height, *self.get_canvas_size())
+        if size[0] >= self.video_width:
+            return None
+        return size
+    
+    def apply_decode_size(self):
+        if self.decoder is None:
+            return False
+        size = self.get_decode_size()
+        if size == self.decoder.output_size:
+            return False
+        self.decoder.set_output_size(size)
+        self.next_decode_frame = -1
+        return True
+    
+    def on_canvas_resize(self, event):
+        if self.apply_decode_size() and self.edit_player is None:
+            self.show_frame(self.current_frame)
+    
+    def toggle_follow(self):
+        if not self.follow_var.get():
+            self.stop_follow()
+            self.status_label.config(text="Follow off")
+            return
+        if self.decoder is None:
+            self.follow_var.set(False)
+            messagebox.showwarning("Warning", "Please open a video first!")
+            return
+        if is_remote(self.video_path):
+            self.follow_var.set(False)
+            messagebox.showwarning("Warning", "Follow mode works with local files only!")
+            return
+        
+        self.following = True
+        self.packet_index = PacketIndex(find_ffmpeg(), self.video_path)
+        self.status_label.config(text="Following file...")
+        self.poll_growth()
+    
+    def stop_follow(self):
+        self.following = False
+        self.follow_var.set(False)
+        self.packet_index = None
+        if self.follow_job is not None:
+            self.root.after_cancel(self.follow_job)
+            self.follow_job = None
+    
+    def poll_growth(self):
+        self.follow_job = self.root.after(1000, self.poll_growth)
+        if self.follow_scanning or self.packet_index is None:
+            return
+        try:
+            if os.path.getsize(self.video_path) == self.packet_index.size:
+                return
+        except OSError:
+            return
+        
+        # Scan the new part of the file in the background
+        self.follow_scanning = True
+        index = self.packet_index
+        
+        def scan():
+            try:
+                changed = index.update()
+            except Exception:
+                changed = False
+            self.root.after(0, lambda: self.apply_growth(index, changed))
+        
+        thread = threading.Thread(target=scan)
+        thread.daemon = True
+        thread.start()
+    
+    def apply_growth(self, index, changed):
+        self.follow_scanning = False
+        if index is not self.packet_index or not changed:
+            return
+        
+        self.total_frames = index.frame_count
+        self.duration = self.total_frames / self.fps
+        self.decoder.frame_count = self.total_frames
+        self.decoder.duration = self.duration
+        
+        self.update_slider_position()
+        self.draw_slider()
+        self.update_time_label()
+        self.status_label.config(text=f"Following: {self.format_time(self.duration)}")
+    
+    def toggle_pixel_peep(self):
+        self.stop_edit_preview()
+        if self.apply_decode_size():
+            self.show_frame(self.current_frame)
+        mode = "pixel peep 1:1" if self.pixel_peep_var.get() else "fit to window"
+        self.status_label.config(text=f"Preview: {mode}")
+    
+    def on_canvas_click(self, event):
+        if self.decoder is None or not self.pixel_peep_var.get():
+            return
+        # Move the peep window so the clicked point becomes the center
+        canvas_width, canvas_height = self.get_canvas_size()
+        cx = self.peep_center[0] + (event.x - canvas_width / 2) / self.video_width
+        cy = self.peep_center[1] + (event.y - canvas_height / 2) / self.video_height
+        self.peep_center = (max(0, min(1, cx)), max(0, min(1, cy)))
+        if self.peep_frame is not None:
+            self.display_frame(self.peep_frame)
+        else:
+            self.show_frame(self.current_frame)
+    
+    def update_slider_position(self):
+        if self.timeline_var.get() == "edit" and self.segments:
+            self.slider_value = min(1, self.edit_position / edit_duration(self.segments))
+        elif self.total_frames > 0:
+            self.slider_value = self.current_frame / self.total_frames
+        else:
+            return
+        if not self.slider_dragging:
+            self.draw_slider()
+    
+    def update_timeline_mode(self):
+        self.update_slider_position()
+        self.draw_slider()
+        self.update_time_label()
+    
+    def toggle_edit_preview(self):
+        if self.edit_player is not None:
+            self.stop_edit_preview()
+        else:
+            self.start_edit_preview()
+    
+    def start_edit_preview(self):
+        if self.decoder is None:
+            messagebox.showwarning("Warning", "Please open a video first!")
+            return
+        if not self.segments:
+            messagebox.showwarning("Warning", "No segments to preview!")
+            return
+        
+        # Continue from the current position if it is inside a segment
+        position = source_to_edit(self.segments, self.get_current_time())
+        if position is None or position >= edit_duration(self.segments) - 1 / self.fps:
+            position = 0
+        
+        path = self.source_url
+        backend = self.decoder_backend
+        ffmpeg_path = find_ffmpeg()
+        size = self.get_decode_size()
+        
+        def make_decoder():
+            decoder = create_decoder(backend, ffmpeg_path)
+            decoder.set_output_size(size)
+            return decoder if decoder.open(path) else None
+        
+        self.edit_player = EditPreviewPlayer(make_decoder, self.segments,
+                                             self.on_edit_frame, self.on_edit_finish)
+        self.edit_frame_pending = False
+        self.edit_player.start(position)
+        self.preview_btn.config(text="Stop Preview", bg="#ff5722")
+        self.status_label.config(text="Previewing edit list")
+    
+    def stop_edit_preview(self):
+        if self.edit_player is None:
+            return
+        self.edit_player.stop()
+        self.edit_player = None
+        self.preview_btn.config(text="Preview Edit", bg="#4CAF50")
+        self.status_label.config(text="Preview stopped")
+    
+    def on_edit_frame(self, player, frame, idx, source_time, position):
+        # Called from the player thread, drop frames while the UI is behind
+        if self.edit_frame_pending:
+            return
+        self.edit_frame_pending = True
+        self.root.after(0, lambda: self.show_edit_frame(player, frame, idx, source_time, position))
+    
+    def on_edit_finish(self, player):
+        self.root.after(0, lambda: self.edit_preview_finished(player))
+    
+    def show_edit_frame(self, player, frame, idx, source_time, position):
+        self.edit_frame_pending = False
+        if player is not self.edit_player:
+            return
+        
+        self.current_frame = min(int(round(source_time * self.fps)), self.total_frames - 1)
+        self.edit_position = position
+        self.display_frame(frame)
+        self.update_slider_position()
+        self.update_time_label()
+        
+        if self.segment_listbox.curselection() != (idx,):
+            self.segment_listbox.selection_clear(0, tk.END)
+            self.segment_listbox.selection_set(idx)
+            self.segment_listbox.see(idx)
+    
+    def edit_preview_finished(self, player):
+        if player is self.edit_player:
+            self.stop_edit_preview()
+            self.status_label.config(text="Preview finished")
+    
     def seek_to_frame(self, frame_num):
         frame_num = max(0, min(frame_num, self.total_frames - 1))
         self.show_frame(frame_num)
@@ -467,8 +1939,9 @@ class VideoCutter:
             self.root.after(0, self.pause_video)
     
     def step_frame(self, delta):
-        if self.cap is None:
+        if self.decoder is None:
             return
+        self.stop_edit_preview()
         if self.is_playing:
             self.pause_video()
         new_frame = self.current_frame + delta
@@ -476,7 +1949,7 @@ class VideoCutter:
         self.show_frame(new_frame)
     
     def get_current_time(self):
-        if self.cap is None:
+        if self.decoder is None:
             return 0
         return self.current_frame / self.fps
     
@@ -491,6 +1964,9 @@ class VideoCutter:
     def update_time_label(self):
         current = self.format_time(self.get_current_time())
         total = self.format_time(self.duration)
+        if self.timeline_var.get() == "edit" and self.segments:
+            current = self.format_time(self.edit_position)
+            total = self.format_time(edit_duration(self.segments))
         self.time_label.config(text=f"{current} / {total}")
     
     def update_mark_labels(self):
@@ -498,7 +1974,7 @@ class VideoCutter:
         self.end_label.config(text=f"End: {self.format_time(self.end_mark)}")
     
     def mark_start(self):
-        if self.cap is None:
+        if self.decoder is None:
             messagebox.showwarning("Warning", "Please open a video first!")
             return
         self.start_mark = self.get_current_time()
@@ -507,7 +1983,7 @@ class VideoCutter:
         self.status_label.config(text="Start point marked")
     
     def mark_end(self):
-        if self.cap is None:
+        if self.decoder is None:
             messagebox.showwarning("Warning", "Please open a video first!")
             return
         self.end_mark = self.get_current_time()
@@ -540,6 +2016,181 @@ class VideoCutter:
         
         self.status_label.config(text=f"Segment {idx} added")
     
+    def add_segments(self, segments):
+        # Bulk add, skipping anything that overlaps a segment already in the list
+        added = 0
+        for start, end in sorted(segments):
+            end = min(end, self.duration)
+            if end <= start:
+                continue
+            if any(start < e and s < end for s, e in self.segments):
+                continue
+            self.segments.append((start, end))
+            added += 1
+        self.refresh_listbox()
+        self.draw_slider()
+        return added
+    
+    def show_repeats_menu(self):
+        x = self.repeats_btn.winfo_rootx()
+        y = self.repeats_btn.winfo_rooty() + self.repeats_btn.winfo_height()
+        try:
+            self.repeats_menu.tk_popup(x, y)
+        finally:
+            self.repeats_menu.grab_release()
+    
+    def get_query_segment(self):
+        if self.start_mark is not None and self.end_mark is not None and self.start_mark < self.end_mark:
+            return self.start_mark, self.end_mark
+        selection = self.segment_listbox.curselection()
+        if selection:
+            return self.segments[selection[0]]
+        return None
+    
+    def choose_library(self):
+        folder = filedialog.askdirectory(title="Choose Video Library Folder")
+        if not folder:
+            return
+        self.library_dir = folder
+        self.save_config()
+        self.open_library()
+    
+    def open_library(self):
+        index = PHashIndex(self.library_dir, self.sample_interval)
+        try:
+            index.load()
+        except Exception:
+            index.files = {}  # unreadable, rebuilt by the update below
+        self.phash_index = index
+        self.library_matches = {}
+        self.update_library()
+    
+    def update_library(self):
+        if self.phash_index is None:
+            messagebox.showwarning("Warning", "Please choose a library folder first!")
+            return
+        if self.library_indexing:
+            return
+        self.library_indexing = True
+        self.status_label.config(text="Indexing library...")
+        index = self.phash_index
+        ffmpeg_path = find_ffmpeg()
+        workers = self.index_workers or None
+        
+        def progress(done, total):
+            self.root.after(0, lambda: self.status_label.config(text=f"Indexing library: {done}/{total}"))
+        
+        def work():
+            try:
+                hashed = index.update(ffmpeg_path, workers, progress)
+                text = f"Library: {len(index.files)} files indexed, {hashed} updated"
+            except Exception as exc:
+                text = f"Library indexing failed: {exc}"
+            self.root.after(0, lambda: self.library_updated(text))
+        
+        thread = threading.Thread(target=work)
+        thread.daemon = True
+        thread.start()
+    
+    def library_updated(self, text):
+        self.library_indexing = False
+        self.status_label.config(text=text)
+        
+        # New files in the library get indexed on the next rescan
+        if self.rescan_job is not None:
+            self.root.after_cancel(self.rescan_job)
+            self.rescan_job = None
+        if self.rescan_interval > 0 and self.phash_index is not None:
+            self.rescan_job = self.root.after(self.rescan_interval * 1000, self.update_library)
+    
+    def find_repeats(self, scope):
+        if self.decoder is None:
+            messagebox.showwarning("Warning", "Please open a video first!")
+            return
+        segment = self.get_query_segment()
+        if segment is None:
+            messagebox.showwarning("Warning", "Mark a segment or select one in the list first!")
+            return
+        if scope == "library" and self.phash_index is None:
+            messagebox.showwarning("Warning", "Please choose a library folder first!")
+            return
+        if self.repeats_searching:
+            self.status_label.config(text="Search already running")
+            return
+        
+        # A library search uses whatever is indexed so far, even during indexing
+        self.repeats_searching = True
+        partial = scope == "library" and self.library_indexing
+        self.status_label.config(text="Searching for repeats...")
+        start, end = segment
+        ffmpeg_path = find_ffmpeg()
+        video_path = self.video_path
+        source_url = self.source_url
+        index = self.phash_index
+        interval = self.sample_interval
+        max_distance = self.max_distance
+        fps = self.fps
+        
+        def work():
+            try:
+                # One sampling per frame of the interval, so every occurrence has a query at its phase
+                phases = min(SEARCH_PHASES, max(1, int(round(interval * fps))))
+                queries = hash_query(ffmpeg_path, source_url, start, end, interval, phases)
+                if scope == "library":
+                    matches = list(index.search(queries, max_distance, end - start))
+                else:
+                    hashes = None
+                    if index is not None and not is_remote(video_path):
+                        hashes = index.hashes_for(video_path)
+                    if hashes is None:
+                        hashes = hash_video_file(ffmpeg_path, source_url, interval)[1]
+                    matches = [(video_path, t) for t in
+                               locate_sequence(hashes, queries, interval, max_distance, end - start)]
+                
+                # The sampling grid places a match only roughly, move it to the exact frame.
+                # Other library files are compared at the frame rate of the open file.
+                head = hash_video_file(ffmpeg_path, source_url, 1 / fps, start,
+                                       min(end - start, REFINE_SECONDS))[1]
+                matches = [(path, refine_start(ffmpeg_path, source_url if path == video_path else path,
+                                               t, head, fps, interval))
+                           for path, t in matches]
+                self.root.after(0, lambda: self.repeats_found(matches, end - start, partial))
+            except Exception as exc:
+                self.root.after(0, self.repeats_failed, str(exc))
+        
+        thread = threading.Thread(target=work)
+        thread.daemon = True
+        thread.start()
+    
+    def repeats_found(self, matches, length, partial=False):
+        self.repeats_searching = False
+        
+        # Matches in the open file go to the list, the others wait until their file is opened
+        current_key = path_key(self.video_path) if self.video_path else None
+        current = []
+        others = 0
+        for path, start in matches:
+            segment = (start, start + length)
+            key = path_key(path)
+            if key == current_key:
+                current.append(segment)
+            else:
+                self.library_matches.setdefault(key, []).append(segment)
+                others += 1
+        
+        added = self.add_segments(current)
+        text = f"Added {added} segments"
+        if others:
+            text += f", {others} matches in {len(self.library_matches)} other files"
+        if partial:
+            text += " (index still building)"
+        self.status_label.config(text=text)
+    
+    def repeats_failed(self, message):
+        self.repeats_searching = False
+        self.status_label.config(text="Search failed!")
+        messagebox.showerror("Error", f"Failed to search for repeats:\n{message}")
+    
     def show_context_menu(self, event):
         try:
             self.segment_listbox.selection_clear(0, tk.END)
@@ -614,30 +2265,51 @@ class VideoCutter:
             return
         
         # Get ffmpeg path
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        ffmpeg_path = os.path.join(script_dir, "ffmpeg.exe")
-        
-        if not os.path.exists(ffmpeg_path):
-            # Try just 'ffmpeg' in PATH
-            ffmpeg_path = "ffmpeg"
+        ffmpeg_path = find_ffmpeg()
         
         # Create output filename
-        base, ext = os.path.splitext(self.video_path)
-        if self.encoding_mode == "reencode":
+        base = os.path.splitext(source_name(self.video_path))[0]
+        ext = source_ext(self.video_path)
+        if self.encoding_mode in ("reencode", "renditions"):
             ext = ".mp4"
-        output_path = f"{base}_cut{ext}"
         
-        # Ask for confirmation
-        if os.path.exists(output_path):
-            if not messagebox.askyesno("Confirm", f"Output file already exists:\n{output_path}\n\nOverwrite?"):
+        if is_remote(self.video_path):
+            # No local folder next to the source, ask where to save
+            output_path = filedialog.asksaveasfilename(title="Save Cut Video",
+                                                       initialfile=f"{base}_cut{ext}",
+                                                       defaultextension=ext)
+            if not output_path:
+                return
+        else:
+            base = os.path.splitext(self.video_path)[0]
+            output_path = f"{base}_cut{ext}"
+            
+            # Ask for confirmation
+            if self.encoding_mode != "renditions" and os.path.exists(output_path):
+                if not messagebox.askyesno("Confirm", f"Output file already exists:\n{output_path}\n\nOverwrite?"):
+                    return
+        
+        if self.encoding_mode == "renditions":
+            if not self.renditions:
+                messagebox.showwarning("Warning", "No renditions in config.ini!")
                 return
+            base = os.path.splitext(output_path)[0]
+            output_paths = [f"{base}{r['suffix']}.mp4" for r in self.renditions]
+            existing = [path for path in output_paths if os.path.exists(path)]
+            if existing:
+                if not messagebox.askyesno("Confirm", "Output files already exist:\n" + "\n".join(existing) + "\n\nOverwrite?"):
+                    return
         
         self.status_label.config(text="Processing... Please wait")
         self.cut_btn.config(state=tk.DISABLED)
+        self.exporting = True
         self.root.update()
         
         # Run cutting in a thread
-        thread = threading.Thread(target=self.do_cut, args=(ffmpeg_path, output_path))
+        if self.encoding_mode == "renditions":
+            thread = threading.Thread(target=self.do_cut_renditions, args=(ffmpeg_path, output_paths))
+        else:
+            thread = threading.Thread(target=self.do_cut, args=(ffmpeg_path, output_path))
         thread.start()
 
     def update_encoding_mode(self):
@@ -668,7 +2340,7 @@ class VideoCutter:
                 if self.encoding_mode == "reencode":
                     temp_ext = ".mp4"
                 else:
-                    temp_ext = os.path.splitext(self.video_path)[1]
+                    temp_ext = source_ext(self.video_path)
                 temp_file = os.path.join(temp_dir, f"segment_{i}{temp_ext}")
                 temp_files.append(temp_file)
 
@@ -678,57 +2350,16 @@ class VideoCutter:
                     ffmpeg_path,
                     "-y",
                     "-ss", str(start),
-                    "-i", self.video_path,
+                    *self.get_input_args(),
                     "-t", str(duration),
                     *encode_params,
                     temp_file
                 ]
                 
-                with open("ffmpeg.log", "w", encoding="utf-8", errors="ignore") as log:
-                    p = subprocess.Popen(
-                        cmd,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.STDOUT,
-                        text=True,
-                        creationflags=0
-                    )
-
-                    for line in p.stdout:
-                        print(line, end="")
-                        log.write(line)
-
-                    p.wait()
-
-            # Если один сегмент — просто копируем
-            if len(temp_files) == 1:
-                import shutil
-                shutil.copy(temp_files[0], output_path)
-            else:
-                # Создаём concat файл
-                concat_file = os.path.join(temp_dir, "concat_list.txt")
-                with open(concat_file, "w", encoding="utf-8") as f:
-                    for temp_file in temp_files:
-                        escaped = temp_file.replace("\\", "/").replace("'", "'\\''")
-                        f.write(f"file '{escaped}'\n")
-
-                # Для конкатенации всегда используем copy, даже если перекодировали сегменты
-                cmd = [
-                    ffmpeg_path,
-                    "-y",
-                    "-f", "concat",
-                    "-safe", "0",
-                    "-i", concat_file,
-                    "-c", "copy",
-                    output_path
-                ]
-
-                result = subprocess.run(cmd, capture_output=True, text=True,
-                                       creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
+                if self.run_ffmpeg(cmd) != 0:
+                    raise Exception(f"FFmpeg error in segment {i + 1}, see ffmpeg.log")
 
-                if result.returncode != 0:
-                    raise Exception(f"FFmpeg concat error:\n{result.stderr}")
-
-                os.remove(concat_file)
+            self.concat_segments(ffmpeg_path, temp_files, output_path, temp_dir)
 
             # Удаляем временные файлы
             for temp_file in temp_files:
@@ -742,8 +2373,107 @@ class VideoCutter:
         except Exception as exc:
             self.root.after(0, self.cut_complete, False, str(exc))
     
+    def do_cut_renditions(self, ffmpeg_path, output_paths):
+        # Every segment is decoded once and split to all rendition encoders
+        try:
+            renditions = list(self.renditions)
+            temp_files = [[] for _ in renditions]
+            temp_dir = tempfile.gettempdir()
+
+            graph = f"[0:v]split={len(renditions)}" + "".join(f"[s{r}]" for r in range(len(renditions)))
+            labels = []
+            for r, rendition in enumerate(renditions):
+                if rendition["scale"]:
+                    graph += f";[s{r}]scale={rendition['scale']}[v{r}]"
+                    labels.append(f"[v{r}]")
+                else:
+                    labels.append(f"[s{r}]")
+
+            for i, (start, end) in enumerate(self.segments):
+                # -t before -i limits the input, so it applies to every output
+                cmd = [
+                    ffmpeg_path,
+                    "-y",
+                    "-ss", str(start),
+                    "-t", str(end - start),
+                    *self.get_input_args(),
+                    "-filter_complex", graph,
+                ]
+                for r, rendition in enumerate(renditions):
+                    temp_file = os.path.join(temp_dir, f"segment_{i}_{r}.mp4")
+                    temp_files[r].append(temp_file)
+                    cmd += ["-map", labels[r], "-map", "0:a?", *rendition["options"].split(), temp_file]
+
+                if self.run_ffmpeg(cmd) != 0:
+                    raise Exception(f"FFmpeg error in segment {i + 1}, see ffmpeg.log")
+
+            for files, output_path in zip(temp_files, output_paths):
+                self.concat_segments(ffmpeg_path, files, output_path, temp_dir)
+
+            for files in temp_files:
+                for temp_file in files:
+                    try:
+                        os.remove(temp_file)
+                    except OSError:
+                        pass
+
+            self.root.after(0, lambda: self.cut_complete(True, "\n".join(output_paths)))
+
+        except Exception as exc:
+            self.root.after(0, self.cut_complete, False, str(exc))
+
+    def run_ffmpeg(self, cmd):
+        with open("ffmpeg.log", "w", encoding="utf-8", errors="ignore") as log:
+            p = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                creationflags=0
+            )
+
+            for line in p.stdout:
+                print(line, end="")
+                log.write(line)
+
+            p.wait()
+        return p.returncode
+
+    def concat_segments(self, ffmpeg_path, temp_files, output_path, temp_dir):
+        # Если один сегмент — просто копируем
+        if len(temp_files) == 1:
+            import shutil
+            shutil.copy(temp_files[0], output_path)
+        else:
+            # Создаём concat файл
+            concat_file = os.path.join(temp_dir, "concat_list.txt")
+            with open(concat_file, "w", encoding="utf-8") as f:
+                for temp_file in temp_files:
+                    escaped = temp_file.replace("\\", "/").replace("'", "'\\''")
+                    f.write(f"file '{escaped}'\n")
+
+            # Для конкатенации всегда используем copy, даже если перекодировали сегменты
+            cmd = [
+                ffmpeg_path,
+                "-y",
+                "-f", "concat",
+                "-safe", "0",
+                "-i", concat_file,
+                "-c", "copy",
+                output_path
+            ]
+
+            result = subprocess.run(cmd, capture_output=True, text=True,
+                                   creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
+
+            if result.returncode != 0:
+                raise Exception(f"FFmpeg concat error:\n{result.stderr}")
+
+            os.remove(concat_file)
+
     def cut_complete(self, success, message):
         self.cut_btn.config(state=tk.NORMAL)
+        self.exporting = False
         
         if success:
             self.status_label.config(text="Cut complete!")
@@ -752,10 +2482,22 @@ class VideoCutter:
             self.status_label.config(text="Cut failed!")
             messagebox.showerror("Error", f"Failed to cut video:\n{message}")
     
+    def get_input_args(self):
+        if self.following:
+            # Wait at EOF for the writer instead of ending the segment early
+            return ["-follow", "1", "-rw_timeout", "10000000", "-i", f"file:{self.video_path}"]
+        return ["-i", self.source_url]
+    
     def on_close(self):
+        self.stop_edit_preview()
+        self.stop_follow()
+        if self.rescan_job is not None:
+            self.root.after_cancel(self.rescan_job)
         self.stop_thread = True
-        if self.cap is not None:
-            self.cap.release()
+        if self.decoder is not None:
+            self.decoder.close()
+        if self.remote_server is not None:
+            self.remote_server.close()
         self.root.destroy()
         
     def load_config(self):
@@ -767,9 +2509,34 @@ class VideoCutter:
             if "Encoding" in config:
                 self.encoding_mode = config["Encoding"].get("mode", "copy")
                 self.reencode_options = config["Encoding"].get("reencode_options", defOpts)
+            if "Preview" in config:
+                self.decoder_backend = config["Preview"].get("decoder", defDecoder)
+            renditions = []
+            for section in config.sections():
+                if section.startswith("Rendition "):
+                    renditions.append({
+                        "name": section[len("Rendition "):].strip(),
+                        "suffix": config[section].get("suffix", ""),
+                        "scale": config[section].get("scale", ""),
+                        "options": config[section].get("options", defOpts)
+                    })
+            if renditions:
+                self.renditions = renditions
+            if "Library" in config:
+                self.library_dir = config["Library"].get("folder", "")
+                self.sample_interval = config["Library"].getfloat("sample_interval", defSampleInterval)
+                self.max_distance = config["Library"].getfloat("max_distance", defMaxDistance)
+                self.rescan_interval = config["Library"].getint("rescan_interval", defRescanInterval)
+                self.index_workers = config["Library"].getint("workers", 0)
+            if "Remote" in config:
+                self.cache_dir = config["Remote"].get("cache_dir", "")
+                self.cache_size_mb = config["Remote"].getint("cache_size_mb", defCacheSizeMb)
+                self.block_size_kb = config["Remote"].getint("block_size_kb", defBlockSizeKb)
+                self.readahead_blocks = config["Remote"].getint("readahead_blocks", defReadahead)
         else:
             self.encoding_mode = "copy"
             self.reencode_options = defOpts
+            self.decoder_backend = defDecoder
             self.save_config()
 
         if hasattr(self, 'encoding_var'):
@@ -781,6 +2548,28 @@ class VideoCutter:
             "mode": self.encoding_mode,
             "reencode_options": self.reencode_options
         }
+        config["Preview"] = {
+            "decoder": self.decoder_backend
+        }
+        for rendition in self.renditions:
+            config[f"Rendition {rendition['name']}"] = {
+                "suffix": rendition["suffix"],
+                "scale": rendition["scale"],
+                "options": rendition["options"]
+            }
+        config["Remote"] = {
+            "cache_dir": self.cache_dir,
+            "cache_size_mb": str(self.cache_size_mb),
+            "block_size_kb": str(self.block_size_kb),
+            "readahead_blocks": str(self.readahead_blocks)
+        }
+        config["Library"] = {
+            "folder": self.library_dir,
+            "sample_interval": str(self.sample_interval),
+            "max_distance": str(self.max_distance),
+            "rescan_interval": str(self.rescan_interval),
+            "workers": str(self.index_workers)
+        }
         config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.ini")
         with open(config_path, "w", encoding="utf-8") as configfile:
             config.write(configfile)        
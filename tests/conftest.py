@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def sample_video(tmp_path):
+    """30 frames of 64x48 MJPEG at 10 fps, frame i is filled with gray level i * 8."""
+    cv2 = pytest.importorskip("cv2")
+    np = pytest.importorskip("numpy")
+    path = str(tmp_path / "sample.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(30):
+        writer.write(np.full((48, 64, 3), i * 8, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+@pytest.fixture
+def repeat_video(tmp_path):
+    """
+    20 s of 128x96 MJPEG at 25 fps that fades between random images every
+    0.5 s. The same 4 s intro is at 5.2 s and 14.4 s, off a 0.5 s grid.
+    """
+    cv2 = pytest.importorskip("cv2")
+    np = pytest.importorskip("numpy")
+
+    def clip(seed, seconds):
+        rnd = np.random.RandomState(seed)
+        keys = [cv2.resize(rnd.randint(0, 256, (3, 4)).astype(np.float32), (128, 96),
+                           interpolation=cv2.INTER_CUBIC) for _ in range(int(seconds * 2) + 2)]
+        frames = []
+        for i in range(int(round(seconds * 25))):
+            k, a = divmod(i / 12.5, 1)
+            frame = (1 - a) * keys[int(k)] + a * keys[int(k) + 1]
+            frames.append(cv2.cvtColor(np.clip(frame, 0, 255).astype(np.uint8), cv2.COLOR_GRAY2BGR))
+        return frames
+
+    intro = clip(1, 4.0)
+    background = clip(2, 20.0)
+    path = str(tmp_path / "repeats.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 25, (128, 96))
+    for frame in background[:130] + intro + background[230:360] + intro + background[460:]:
+        writer.write(frame)
+    writer.release()
+    return path
@@ -0,0 +1,91 @@
+import shutil
+import subprocess
+
+import pytest
+
+pytest.importorskip("cv2")
+
+from main import create_decoder, find_ffmpeg
+
+
+def test_opencv_decoder_open_and_read(sample_video):
+    decoder = create_decoder("opencv")
+    assert decoder.open(sample_video)
+    assert (decoder.width, decoder.height) == (64, 48)
+    assert decoder.fps == pytest.approx(10)
+    assert decoder.frame_count == 30
+
+    pts, frame = decoder.read()
+    assert pts == pytest.approx(0)
+    assert frame.shape == (48, 64, 3)
+    pts, frame = decoder.read()
+    assert pts == pytest.approx(0.1)
+    decoder.close()
+
+
+def test_opencv_decoder_seek(sample_video):
+    decoder = create_decoder("opencv")
+    assert decoder.open(sample_video)
+    decoder.seek(2.0)
+    pts, frame = decoder.read()
+    assert pts == pytest.approx(2.0)
+    assert abs(int(frame.mean()) - 20 * 8) <= 4
+    decoder.close()
+
+
+def test_opencv_decoder_output_size(sample_video):
+    decoder = create_decoder("opencv")
+    decoder.set_output_size((32, 24))
+    assert decoder.open(sample_video)
+    pts, frame = decoder.read()
+    assert frame.shape == (24, 32, 3)
+    decoder.close()
+
+
+def test_auto_decoder(tmp_path):
+    assert create_decoder("auto", str(tmp_path / "no-ffmpeg")).name == "opencv"
+    if shutil.which(find_ffmpeg()):
+        assert create_decoder("auto", find_ffmpeg()).name == "ffmpeg"
+
+
+def test_opencv_decoder_missing_file(tmp_path):
+    decoder = create_decoder("opencv")
+    assert not decoder.open(str(tmp_path / "missing.mp4"))
+
+
+@pytest.mark.skipif(shutil.which(find_ffmpeg()) is None, reason="ffmpeg not available")
+def test_ffmpeg_decoder_matches_opencv(sample_video):
+    decoder = create_decoder("ffmpeg", find_ffmpeg())
+    assert decoder.open(sample_video)
+    assert (decoder.width, decoder.height) == (64, 48)
+    assert decoder.fps == pytest.approx(10)
+
+    decoder.seek(1.5)
+    pts, frame = decoder.read()
+    assert pts == pytest.approx(1.5)
+    assert abs(int(frame.mean()) - 15 * 8) <= 4
+
+    decoder.set_output_size((32, 24))
+    pts, frame = decoder.read()
+    assert frame.shape == (24, 32, 3)
+    assert pts == pytest.approx(1.6)
+    decoder.close()
+
+
+@pytest.mark.skipif(shutil.which(find_ffmpeg()) is None, reason="ffmpeg not available")
+@pytest.mark.parametrize("backend", ["opencv", "ffmpeg"])
+def test_decoder_reports_real_timestamps(tmp_path, backend):
+    # 10 fps with a 0.5 s gap after frame 10, nominal index / fps would miss it
+    path = str(tmp_path / "vfr.mkv")
+    subprocess.run([find_ffmpeg(), "-v", "error", "-y", "-f", "lavfi",
+                    "-i", "testsrc=size=160x120:rate=10", "-t", "2",
+                    "-vf", "setpts='N*0.1/TB+if(gte(N,10),0.5/TB,0)'",
+                    "-vsync", "passthrough", "-c:v", "mjpeg", path], check=True)
+
+    decoder = create_decoder(backend, find_ffmpeg())
+    assert decoder.open(path)
+    timestamps = [decoder.read()[0] for _ in range(12)]
+    assert timestamps[9] == pytest.approx(0.9)
+    assert timestamps[10] == pytest.approx(1.5)
+    assert timestamps[11] == pytest.approx(1.6)
+    decoder.close()
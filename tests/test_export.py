@@ -0,0 +1,86 @@
+import os
+import shutil
+
+import pytest
+
+pytest.importorskip("cv2")
+
+from main import VideoCutter, find_ffmpeg, source_ext
+
+pytestmark = pytest.mark.skipif(shutil.which(find_ffmpeg()) is None, reason="ffmpeg not available")
+
+
+class ImmediateRoot:
+    def after(self, delay, func, *args):
+        func(*args)
+
+
+def make_cutter(video, segments, mode="copy"):
+    # Only the state the export paths read, no Tk window
+    app = VideoCutter.__new__(VideoCutter)
+    app.root = ImmediateRoot()
+    app.video_path = video
+    app.source_url = video
+    app.following = False
+    app.segments = segments
+    app.encoding_mode = mode
+    app.reencode_options = "-c:v mjpeg"
+    app.renditions = [
+        {"name": "full", "suffix": "_full", "scale": "", "options": "-c:v mjpeg"},
+        {"name": "small", "suffix": "_small", "scale": "32:24", "options": "-c:v mjpeg"},
+    ]
+    app.results = []
+    app.cut_complete = lambda success, message: app.results.append((success, message))
+    return app
+
+
+def test_copy_export(sample_video, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    output = str(tmp_path / "out.avi")
+    app = make_cutter(sample_video, [(0.0, 1.0), (2.0, 2.5)])
+    app.do_cut(find_ffmpeg(), output)
+    assert app.results == [(True, output)]
+    assert os.path.getsize(output) > 0
+
+
+@pytest.mark.parametrize("path, ext", [
+    ("clip.avi", ".avi"),
+    ("http://example.com/videos/clip.MOV?token=1", ".MOV"),
+    ("http://example.com/media?id=123", ".mkv"),
+    ("http://example.com/", ".mkv"),
+])
+def test_source_ext(path, ext):
+    assert source_ext(path) == ext
+
+
+def test_copy_export_of_url_without_extension(sample_video, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("tempfile.gettempdir", lambda: str(tmp_path))
+    output = str(tmp_path / "media_cut.mkv")
+    app = make_cutter(sample_video, [(0.0, 1.0), (2.0, 2.5)])
+    app.video_path = "http://example.com/media?id=123"
+    app.do_cut(find_ffmpeg(), output)
+    assert app.results == [(True, output)]
+    assert os.path.getsize(output) > 0
+
+
+def test_failed_segment_is_reported(sample_video, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("tempfile.gettempdir", lambda: str(tmp_path))
+    # A segment file left over from an earlier run must not be exported as the result
+    (tmp_path / "segment_0.mp4").write_bytes(b"stale")
+    output = str(tmp_path / "out.mp4")
+    app = make_cutter(sample_video, [(0.0, 1.0)], mode="reencode")
+    app.reencode_options = "-c:v no_such_encoder"
+    app.do_cut(find_ffmpeg(), output)
+    assert app.results[0][0] is False
+    assert not os.path.exists(output)
+
+
+def test_renditions_export(sample_video, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    outputs = [str(tmp_path / "out_full.avi"), str(tmp_path / "out_small.avi")]
+    app = make_cutter(sample_video, [(0.0, 1.0), (2.0, 2.5)], mode="renditions")
+    app.do_cut_renditions(find_ffmpeg(), outputs)
+    assert app.results == [(True, "\n".join(outputs))]
+    assert all(os.path.getsize(path) > 0 for path in outputs)
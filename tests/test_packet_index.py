@@ -0,0 +1,49 @@
+import os
+import stat
+import sys
+
+import pytest
+
+from main import PacketIndex
+
+# Stand-in for ffmpeg's framecrc output: packets in decode order of an
+# I P B B GOP structure, one packet per 100 bytes written, 25 fps, start 1.4 s.
+# -ss lands on the keyframe of the GOP before the requested time.
+FAKE_FFMPEG = """#!{python}
+import os, sys
+a = sys.argv
+ss = float(a[a.index("-ss") + 1]) if "-ss" in a else 0
+n = os.path.getsize(a[a.index("-i") + 1]) // 100
+order = []
+for g in range(0, 10000, 12):
+    order += [g, g + 3, g + 1, g + 2, g + 6, g + 4, g + 5, g + 9, g + 7, g + 8, g + 11, g + 10]
+print("#tb 0: 1/90000")
+first_gop = int(ss * 25) // 12 * 12
+for f in order[:n]:
+    if f >= first_gop:
+        t = int((1.4 + f / 25) * 90000)
+        print("0, %d, %d, 3600, 100, 0xdead" % (t, t))
+"""
+
+
+@pytest.mark.skipif(os.name == "nt", reason="fake ffmpeg is a script")
+def test_incremental_update_keeps_late_b_frames(tmp_path):
+    ffmpeg_path = tmp_path / "ffmpeg"
+    ffmpeg_path.write_text(FAKE_FFMPEG.format(python=sys.executable))
+    ffmpeg_path.chmod(ffmpeg_path.stat().st_mode | stat.S_IEXEC)
+    video = tmp_path / "live.ts"
+    video.write_bytes(b"x" * 1001)
+
+    index = PacketIndex(str(ffmpeg_path), str(video))
+    assert index.update()
+    # Every scan ends in the middle of a GOP
+    for grow in (503, 1777, 2900):
+        with open(video, "ab") as f:
+            f.write(b"x" * grow)
+        index.update()
+
+    written = video.stat().st_size // 100
+    assert index.frame_count == written
+    assert index.pts == sorted(index.pts)
+    assert index.pts[:2] == pytest.approx([0, 0.04], abs=1e-4)
+    assert not index.update()
@@ -0,0 +1,188 @@
+import os
+import shutil
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from main import (PHashIndex, VideoCutter, find_ffmpeg, find_sequence, hamming, hash_query,
+                  hash_video_file, locate_sequence, phash_frames, refine_start)
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which(find_ffmpeg()) is None, reason="ffmpeg not available")
+
+
+def random_hashes(n, seed=0):
+    return np.random.RandomState(seed).randint(0, 2**63, size=n, dtype=np.int64).astype(np.uint64)
+
+
+def smooth_frames(n, seed=0):
+    import cv2
+    rnd = np.random.RandomState(seed)
+    frames = [cv2.resize(rnd.rand(4, 4).astype(np.float32) * 160 + 40, (32, 32), interpolation=cv2.INTER_CUBIC)
+              for _ in range(n)]
+    return np.clip(frames, 0, 215).astype(np.uint8)
+
+
+def test_phash_frames():
+    frames = smooth_frames(8)
+    hashes = phash_frames(frames)
+    assert hashes.dtype == np.uint64
+    assert hashes.shape == (8,)
+    # Same image, same hash; a brightness change barely moves it; other images are far away
+    assert (phash_frames(frames.copy()) == hashes).all()
+    assert hamming(phash_frames(frames + 40), hashes).max() <= 2
+    assert hamming(hashes[1:], hashes[0]).min() > 10
+
+
+@pytest.mark.parametrize("fallback", [False, True])
+def test_hamming(monkeypatch, fallback):
+    if fallback:
+        monkeypatch.delattr(np, "bitwise_count", raising=False)
+    a = random_hashes(50, seed=1)
+    b = random_hashes(50, seed=2)
+    expected = [bin(int(x) ^ int(y)).count("1") for x, y in zip(a, b)]
+    assert list(hamming(a, b)) == expected
+    assert hamming(np.uint64(0), np.uint64(2**64 - 1)) == 64
+    # Broadcasting like a ^ b
+    assert hamming(a[:, None], b[None, :5]).shape == (50, 5)
+    assert hamming(a, a[0])[0] == 0
+
+
+def test_find_sequence_exact_and_near():
+    hashes = random_hashes(200)
+    query = hashes[40:50].copy()
+    hashes[150:160] = query ^ np.uint64(0b111)  # 3 bits off in every hash
+    assert find_sequence(hashes, query, 5) == [(40, 0.0), (150, 3.0)]
+    assert find_sequence(hashes, query, 2) == [(40, 0.0)]
+    assert find_sequence(hashes, query[:0], 5) == []
+    assert find_sequence(hashes[:5], query, 5) == []
+
+
+def test_find_sequence_prefilter():
+    hashes = random_hashes(100)
+    query = hashes[20:30].copy()
+    # Only the first hash is far off: the window is close on average, but the
+    # prefilter on the first hash drops it
+    query[0] = ~query[0]
+    assert hamming(hashes[20:30], query).mean() <= 10
+    assert find_sequence(hashes, query, 10) == []
+
+
+def test_find_sequence_keeps_best_of_overlaps():
+    hashes = random_hashes(100)
+    query = hashes[60:70].copy()
+    # A worse copy overlapping the exact one, and one that does not overlap
+    hashes[55:65] = query ^ np.uint64(1)
+    hashes[60:70] = query
+    hashes[10:20] = query ^ np.uint64(0b11)
+    assert find_sequence(hashes, query, 5) == [(10, 2.0), (60, 0.0)]
+
+
+def test_locate_sequence_picks_closest_phase():
+    hashes = random_hashes(100)
+    query = hashes[30:40].copy()
+    queries = [
+        (0.25, query ^ np.uint64(0b1111)),  # the same occurrence, worse phase
+        (0.1, query),
+    ]
+    # Sample 30 at 15.0 s is 0.1 s into the clip
+    assert locate_sequence(hashes, queries, 0.5, 5, 5.0) == [pytest.approx(14.9)]
+    assert locate_sequence(hashes, queries[:1], 0.5, 5, 5.0) == [pytest.approx(14.75)]
+    assert locate_sequence(hashes, [], 0.5, 5, 5.0) == []
+
+
+@needs_ffmpeg
+def test_repeats_off_the_sampling_grid(repeat_video):
+    ffmpeg_path = find_ffmpeg()
+    hashes = hash_video_file(ffmpeg_path, repeat_video, 0.5)[1]
+    assert len(hashes) == 40
+
+    # Intro marked at 5.2 - 9.2 s, both it and the copy at 14.4 s sit off the 0.5 s grid
+    queries = hash_query(ffmpeg_path, repeat_video, 5.2, 9.2, 0.5, 12)
+    assert len(queries) == 12
+    assert queries[0][0] == pytest.approx(0.3)
+    starts = locate_sequence(hashes, queries, 0.5, 10, 4.0)
+    assert starts == [pytest.approx(5.2, abs=0.05), pytest.approx(14.4, abs=0.05)]
+
+    head = hash_video_file(ffmpeg_path, repeat_video, 1 / 25, 5.2, 1.0)[1]
+    assert [refine_start(ffmpeg_path, repeat_video, t, head, 25, 0.5) for t in starts] == \
+        [pytest.approx(5.2), pytest.approx(14.4)]
+
+
+class ImmediateRoot:
+    def after(self, delay, func, *args):
+        func(*args)
+
+
+class Label:
+    def config(self, **kwargs):
+        self.text = kwargs.get("text")
+
+
+@needs_ffmpeg
+def test_find_repeats_adds_exact_segments(repeat_video):
+    app = VideoCutter.__new__(VideoCutter)
+    app.root = ImmediateRoot()
+    app.status_label = Label()
+    app.decoder = object()
+    app.video_path = app.source_url = repeat_video
+    app.fps = 25.0
+    app.duration = 20.0
+    app.start_mark, app.end_mark = 5.2, 9.2
+    app.segments = []
+    app.phash_index = None
+    app.library_indexing = False
+    app.repeats_searching = False
+    app.library_matches = {}
+    app.sample_interval = 0.5
+    app.max_distance = 10
+    app.refresh_listbox = app.draw_slider = lambda: None
+
+    app.find_repeats("file")
+    deadline = time.time() + 30
+    while app.repeats_searching and time.time() < deadline:
+        time.sleep(0.05)
+    assert app.status_label.text == "Added 2 segments"
+    assert app.segments == [pytest.approx((5.2, 9.2)), pytest.approx((14.4, 18.4))]
+
+
+@needs_ffmpeg
+def test_phash_index_round_trip(sample_video, tmp_path):
+    library = tmp_path / "library"
+    (library / "sub").mkdir(parents=True)
+    shutil.copy(sample_video, library / "a.avi")
+    shutil.copy(sample_video, library / "sub" / "b.avi")
+    (library / "notes.txt").write_text("not a video")
+    ffmpeg_path = find_ffmpeg()
+
+    index = PHashIndex(str(library), 0.5)
+    progress = []
+    assert index.update(ffmpeg_path, workers=1, progress=lambda done, total: progress.append((done, total))) == 2
+    assert sorted(index.files) == ["a.avi", os.path.join("sub", "b.avi")]
+    assert progress[-1] == (2, 2)
+    assert os.path.exists(index.index_path)
+    hashes = index.hashes_for(str(library / "a.avi"))
+    assert len(hashes) == 6
+
+    loaded = PHashIndex(str(library), 0.5)
+    loaded.load()
+    assert sorted(loaded.files) == sorted(index.files)
+    for path, (size, mtime, stored) in index.files.items():
+        assert loaded.files[path][:2] == (size, mtime)
+        assert (loaded.files[path][2] == stored).all()
+    # Nothing changed, nothing hashed
+    assert loaded.update(ffmpeg_path, workers=1) == 0
+
+    # Changed files are hashed again, removed ones dropped
+    os.utime(library / "a.avi", (1, 1))
+    os.remove(library / "sub" / "b.avi")
+    assert loaded.update(ffmpeg_path, workers=1) == 1
+    assert sorted(loaded.files) == ["a.avi"]
+    assert loaded.hashes_for(str(library / "sub" / "b.avi")) is None
+
+    # Another sample interval starts from scratch
+    other = PHashIndex(str(library), 1.0)
+    other.load()
+    assert other.files == {}
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from main import VideoCutter, fit_size
+
+
+class Var:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class Event:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def make_cutter(width, height, canvas=(720, 405), pixel_peep=False):
+    app = VideoCutter.__new__(VideoCutter)
+    app.pixel_peep_var = Var(pixel_peep)
+    app.video_width = width
+    app.video_height = height
+    app.get_canvas_size = lambda: canvas
+    return app
+
+
+@pytest.mark.parametrize("size, box, expected", [
+    ((3840, 2160), (720, 405), (720, 405)),
+    # Limited by the height of the box
+    ((3840, 2160), (720, 300), (533, 300)),
+    # Portrait video in a landscape box
+    ((1080, 1920), (720, 405), (227, 405)),
+    # Smaller sources are scaled up to the box
+    ((320, 240), (720, 405), (540, 405)),
+])
+def test_fit_size(size, box, expected):
+    assert fit_size(*size, *box) == expected
+
+
+def test_decode_size_for_large_sources():
+    assert make_cutter(3840, 2160).get_decode_size() == (720, 405)
+    assert make_cutter(7680, 4320, canvas=(1000, 700)).get_decode_size() == (1000, 562)
+
+
+def test_decode_size_full_resolution():
+    # Sources that fit the canvas, pixel peep and no video are decoded at full size
+    assert make_cutter(640, 360).get_decode_size() is None
+    assert make_cutter(720, 405).get_decode_size() is None
+    assert make_cutter(3840, 2160, pixel_peep=True).get_decode_size() is None
+    assert make_cutter(0, 0).get_decode_size() is None
+
+
+def test_pixel_peep_pan_crops_last_frame():
+    app = make_cutter(3840, 2160, pixel_peep=True)
+    app.decoder = object()
+    app.peep_center = (0.5, 0.5)
+    app.peep_frame = np.zeros((2160, 3840, 3), dtype=np.uint8)
+    shown = []
+    app.display_frame = shown.append
+    app.show_frame = lambda frame_num: pytest.fail("panning decoded the frame again")
+
+    app.on_canvas_click(Event(720, 0))
+    assert shown == [app.peep_frame]
+    assert app.peep_center[0] == pytest.approx(0.5 + 360 / 3840)
+    assert app.peep_center[1] == pytest.approx(0.5 - 202.5 / 2160)
@@ -0,0 +1,171 @@
+import random
+import re
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("cv2")
+
+from main import BlockCache, RemoteSourceServer, VideoCutter
+
+BLOCK_SIZE = 4096
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Upstream server, answers single range requests from server.data."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        data = self.server.data
+        self.server.requests.append(self.headers.get("Range"))
+        match = re.match(r"bytes=(\d+)-(\d+)$", self.headers.get("Range", ""))
+        if match:
+            start, end = int(match.group(1)), min(int(match.group(2)), len(data) - 1)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        else:
+            start, end = 0, len(data) - 1
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        self.wfile.write(data[start:end + 1])
+
+
+@pytest.fixture
+def upstream():
+    # Not a whole number of blocks, so the last block is short
+    data = random.Random(0).randbytes(50 * BLOCK_SIZE + 123)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    httpd.daemon_threads = True
+    httpd.data = data
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield httpd, f"http://127.0.0.1:{httpd.server_address[1]}/video.mp4"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def cache(upstream, tmp_path):
+    httpd, url = upstream
+    # Fewer slots than blocks, reads have to evict
+    cache = BlockCache(url, str(tmp_path), BLOCK_SIZE, 8, 2)
+    cache.open()
+    yield cache
+    cache.close()
+
+
+def get(url, range_header=None):
+    headers = {"Range": range_header} if range_header else {}
+    with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=10) as response:
+        return response.status, response.headers, response.read()
+
+
+def test_cache_sequential_reads(upstream, cache):
+    data = upstream[0].data
+    assert cache.size == len(data)
+    chunks = []
+    for offset in range(0, len(data), 1000):
+        chunks.append(cache.read(offset, 1000))
+    assert b"".join(chunks) == data
+    assert len(cache.slots) <= cache.capacity
+    assert cache.read(len(data), 10) == b""
+
+
+def test_cache_random_reads(upstream, cache):
+    data = upstream[0].data
+    rnd = random.Random(1)
+    for _ in range(200):
+        offset = rnd.randrange(len(data))
+        size = rnd.randrange(1, 3 * BLOCK_SIZE)
+        assert cache.read(offset, size) == data[offset:offset + size]
+    assert len(cache.slots) <= cache.capacity
+
+
+def test_cache_reuses_blocks(upstream, cache):
+    httpd = upstream[0]
+    cache.readahead = 0
+    cache.read(0, BLOCK_SIZE)
+    requests = len(httpd.requests)
+    assert cache.read(100, 200) == httpd.data[100:300]
+    assert len(httpd.requests) == requests
+
+
+def test_proxy_requests(upstream, cache):
+    data = upstream[0].data
+    server = RemoteSourceServer()
+    try:
+        url = server.add(cache)
+        assert url.endswith("/video.mp4")
+
+        status, headers, body = get(url)
+        assert status == 200
+        assert headers["Accept-Ranges"] == "bytes"
+        assert body == data
+
+        status, headers, body = get(url, "bytes=5000-14999")
+        assert status == 206
+        assert headers["Content-Range"] == f"bytes 5000-14999/{len(data)}"
+        assert body == data[5000:15000]
+
+        status, headers, body = get(url, f"bytes={len(data) - 500}-")
+        assert status == 206
+        assert body == data[-500:]
+
+        status, headers, body = get(url, "bytes=-100")
+        assert status == 206
+        assert body == data[-100:]
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            get(url, f"bytes={len(data)}-")
+        assert error.value.code == 416
+
+        server.remove(url)
+        with pytest.raises(urllib.error.HTTPError) as error:
+            get(url)
+        assert error.value.code == 404
+    finally:
+        server.close()
+
+
+def test_open_blocked_during_export(monkeypatch):
+    warnings = []
+    monkeypatch.setattr("main.messagebox.showwarning", lambda *args: warnings.append(args))
+    app = VideoCutter.__new__(VideoCutter)
+    app.exporting = True
+    app.source_url = "http://127.0.0.1:1/key/video.mp4"
+    # The export thread still reads source_url, the proxy cache behind it must stay open
+    app.close_remote = lambda url: pytest.fail("source closed during export")
+    app.load_video("http://example.com/other.mp4")
+    assert warnings
+    assert app.source_url == "http://127.0.0.1:1/key/video.mp4"
+
+
+def test_readahead_finishing_after_close(upstream, tmp_path):
+    cache = BlockCache(upstream[1], str(tmp_path), BLOCK_SIZE, 8, 2)
+    cache.open()
+    # A read-ahead thread claimed blocks, then the video was closed before its fetch returned
+    claimed = cache.claim([3, 4])
+    cache.close()
+    cache.fetch_claimed(claimed)
+    assert not cache.inflight
+    with pytest.raises(Exception, match="closed"):
+        cache.read(0, 10)
+
+
+def test_failed_readahead_is_fetched_again(upstream, cache):
+    data = upstream[0].data
+    good_url = cache.url
+    cache.url = "http://127.0.0.1:1/unreachable.mp4"
+    # A failed read-ahead must not raise in its thread or leave blocks in flight
+    cache.read_ahead(cache.claim([5, 6]))
+    assert not cache.inflight
+    cache.url = good_url
+    assert cache.read(5 * BLOCK_SIZE, 2 * BLOCK_SIZE) == data[5 * BLOCK_SIZE:7 * BLOCK_SIZE]
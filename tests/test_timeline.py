@@ -0,0 +1,137 @@
+import math
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from main import EditPreviewPlayer, VideoCutter, edit_duration, edit_to_source, source_to_edit
+
+# Out of source order on purpose, the edit list plays in list order
+SEGMENTS = [(10.0, 20.0), (0.0, 5.0)]
+
+
+class Var:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class StubDecoder:
+    """Frames at k / fps with no end, the frame holds its index."""
+    fps = 25
+
+    def __init__(self):
+        self.next_index = 0
+
+    def seek(self, timestamp):
+        self.next_index = math.ceil(timestamp * self.fps - 1e-6)
+
+    def read(self):
+        pts = self.next_index / self.fps
+        frame = np.full((2, 2, 3), self.next_index % 256, dtype=np.uint8)
+        self.next_index += 1
+        return pts, frame
+
+    def close(self):
+        pass
+
+
+def make_cutter(timeline):
+    app = VideoCutter.__new__(VideoCutter)
+    app.timeline_var = Var(timeline)
+    app.duration = 100.0
+    app.segments = [(10.0, 20.0), (50.0, 80.0)]
+    return app
+
+
+def test_marks_on_source_timeline():
+    app = make_cutter("source")
+    assert app.mark_position(None) is None
+    assert app.mark_position(25.0) == pytest.approx(0.25)
+    assert app.mark_position(60.0) == pytest.approx(0.6)
+
+
+def test_marks_on_edit_timeline():
+    app = make_cutter("edit")
+    # 40 s of edit list, the second segment starts at 10 s
+    assert app.mark_position(15.0) == pytest.approx(5 / 40)
+    assert app.mark_position(60.0) == pytest.approx(20 / 40)
+    # Cut out of the edit list, not drawn
+    assert app.mark_position(30.0) is None
+    assert app.mark_position(90.0) is None
+    app.segments = []
+    assert app.mark_position(15.0) is None
+
+
+def test_edit_duration():
+    assert edit_duration(SEGMENTS) == 15.0
+    assert edit_duration([]) == 0
+
+
+@pytest.mark.parametrize("edit_time, expected", [
+    (0.0, (0, 10.0)),
+    (-1.0, (0, 10.0)),
+    (9.5, (0, 19.5)),
+    # The end of a segment is the start of the next one
+    (10.0, (1, 0.0)),
+    (12.5, (1, 2.5)),
+    # At and past the end, the last frame of the list
+    (15.0, (1, 5.0)),
+    (100.0, (1, 5.0)),
+])
+def test_edit_to_source(edit_time, expected):
+    idx, source_time = edit_to_source(SEGMENTS, edit_time)
+    assert idx == expected[0]
+    assert source_time == pytest.approx(expected[1])
+
+
+@pytest.mark.parametrize("source_time, expected", [
+    (10.0, 0.0),
+    (15.0, 5.0),
+    (0.0, 10.0),
+    (4.5, 14.5),
+    # Segment ends are exclusive, gaps and the tail are not on the edit list
+    (20.0, None),
+    (5.0, None),
+    (7.0, None),
+    (30.0, None),
+])
+def test_source_to_edit(source_time, expected):
+    result = source_to_edit(SEGMENTS, source_time)
+    if expected is None:
+        assert result is None
+    else:
+        assert result == pytest.approx(expected)
+
+
+def test_mappings_of_empty_list():
+    assert edit_to_source([], 1.0) == (None, None)
+    assert source_to_edit([], 1.0) is None
+
+
+def test_mappings_round_trip():
+    for edit_time in np.arange(0, 15, 0.25):
+        idx, source_time = edit_to_source(SEGMENTS, edit_time)
+        assert source_to_edit(SEGMENTS, source_time) == pytest.approx(edit_time)
+
+
+def test_player_positions_continue_across_segments():
+    frames = []
+    finished = threading.Event()
+    player = EditPreviewPlayer(StubDecoder, [(1.0, 1.2), (3.0, 3.2)],
+                               lambda player, frame, idx, pts, position: frames.append((idx, pts, position)),
+                               lambda player: finished.set())
+    player.start()
+    assert finished.wait(5)
+
+    assert [idx for idx, pts, position in frames] == [0] * 5 + [1] * 5
+    assert [pts for idx, pts, position in frames] == pytest.approx([1.0, 1.04, 1.08, 1.12, 1.16,
+                                                                    3.0, 3.04, 3.08, 3.12, 3.16])
+    # One frame step everywhere, including the switch from 0.16 to 0.20
+    positions = [position for idx, pts, position in frames]
+    assert np.diff(positions) == pytest.approx([0.04] * 9)
+    assert positions[0] == pytest.approx(0)